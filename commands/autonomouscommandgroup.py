@@ -12,7 +12,7 @@ from custom.config import Config
 from commands.drivetrain.movecommand import MoveCommand
 from commands.drivetrain.turncommand import TurnCommand
 from commands.drivetrain.setspeedcommand import SetSpeedCommand
-#from commands.drivetrain.gyromovecommand import GyroMoveCommand
+from commands.drivetrain.gyromovecommand import GyroMoveCommand
 from commands.drivetrain.movewhileintakingcommandgroup import MoveWhileIntakingCommandGroup
 from commands.drivetrain.curvecommand import CurveCommand
 from commands.drivetrain.setslowcommand import SetSlowCommand
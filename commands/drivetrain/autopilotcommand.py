@@ -1,13 +1,20 @@
 from wpilib.command import Command
 
 from controller import logicalaxes
+from custom.headingcontroller import HeadingController
 
 import robot
+import math
 
 logicalaxes.registerAxis('driveY')
 logicalaxes.registerAxis('driveRotate')
 
 class AutoPilotCommand(Command):
+    '''
+    Lets the driver go full speed down the trench. Whenever the rotate stick is
+    released we hold a heading: 0 or 180 if we are within 45 degrees of one,
+    otherwise whatever heading we had when the stick was let go.
+    '''
 
     def __init__(self):
         super().__init__('Auto Pilot')
@@ -16,31 +23,47 @@ class AutoPilotCommand(Command):
 
         robot.drivetrain.resetGyro()
 
+        self.headingController = HeadingController(minOutput=robot.drivetrain.deadband)
+        self.rotateDeadband = 0.1
+        self.laneWindow = 45
+
         self.engaged = False
-    
+
     def initialize(self):
         self.engaged = False
 
     def execute(self):
-        self.currentHeading = robot.drivetrain.getAngle()
-                
         y = logicalaxes.driveY.get() * 0.8
-        
-        if not self.engaged: # Allows it to find it only once.
-            self.engaged = (abs(self.currentHeading - 180) <= 45) or (not 315 >= self.currentHeading >= 45) # 15 degrees of freedom on both sides.
-            rotate = logicalaxes.driveRotate.get() * 0.45
+        rotate = logicalaxes.driveRotate.get()
+
+        if abs(rotate) > self.rotateDeadband: # The driver is steering, so let them.
+            self.engaged = False
+            rotate *= 0.45
+
         else:
-            
-            if not 90 < self.currentHeading < 270:
-                rotate = robot.drivetrain.getAngleTo(0) / 75
-            else:
-                rotate = robot.drivetrain.getAngleTo(180) / 75
-                
+            angle = robot.drivetrain.getContinuousAngle()
+            rate = robot.drivetrain.getYawRate()
+
+            if not self.engaged:
+                self.headingController.setTarget(self.chooseHeading(angle))
+                self.headingController.reset(angle, rate)
+                self.engaged = True
+
+            rotate = self.headingController.calculate(angle, rate)
+
         robot.drivetrain.move(
             0,
             y,
             rotate
         )
 
+    def chooseHeading(self, angle):
+        lane = 0 if math.cos(math.radians(angle)) >= 0 else 180
+
+        if abs((lane - angle + 180) % 360 - 180) <= self.laneWindow:
+            return lane
+
+        return angle
+
     def end(self):
         robot.drivetrain.stop()
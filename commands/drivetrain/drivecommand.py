@@ -40,7 +40,6 @@ class DriveCommand(Command):
 
     def execute(self):
 
-        robot.drivetrain.updateOdometry()
         # Avoid quick changes in direction
         y = logicalaxes.driveY.get() * 0.8
         if self.lastY is None:
@@ -0,0 +1,69 @@
+from wpilib.command import Command
+
+from custom.headingcontroller import HeadingController
+
+import robot
+import math
+
+
+class GyroMoveCommand(Command):
+    '''
+    Drives a distance in inches while holding the heading we started on. Unlike
+    MoveCommand the gyro corrects any drift, so long runs stay straight.
+    '''
+
+    def __init__(self, distance, speed=0.6, heading=None, name=None):
+        '''
+        heading: The gyro angle to hold. By default, the angle we are at when
+                 the command starts.
+        '''
+
+        if name is None:
+            name = 'Gyro Move %f inches' % distance
+
+        super().__init__(name)
+
+        self.requires(robot.drivetrain)
+
+        self.distance = distance
+        self.speed = speed
+        self.heading = heading
+
+        self.headingController = HeadingController(minOutput=robot.drivetrain.deadband)
+        self.slowDownDistance = 24 # Inches before the end where we start slowing.
+        self.minSpeed = 0.15
+
+    def initialize(self):
+        angle = robot.drivetrain.getContinuousAngle()
+
+        self.headingController.setTarget(angle if self.heading is None else self.heading)
+        self.headingController.reset(angle, robot.drivetrain.getYawRate())
+
+        self.startPositions = robot.drivetrain.getPositions()
+        self.target = abs(robot.drivetrain.inchesToUnits(self.distance))
+        self.slowDown = abs(robot.drivetrain.inchesToUnits(self.slowDownDistance))
+        self.travelled = 0
+
+    def execute(self):
+        positions = robot.drivetrain.getPositions()
+
+        '''The right side runs reversed.'''
+        self.travelled = abs(
+            (positions[0] - self.startPositions[0]) - (positions[1] - self.startPositions[1])
+        ) / 2
+
+        remaining = self.target - self.travelled
+        speed = max(self.speed * min(remaining / self.slowDown, 1), self.minSpeed)
+
+        rotate = self.headingController.calculate(
+            robot.drivetrain.getContinuousAngle(),
+            robot.drivetrain.getYawRate()
+        )
+
+        robot.drivetrain.move(0, math.copysign(speed, self.distance), rotate)
+
+    def isFinished(self):
+        return self.travelled >= self.target
+
+    def end(self):
+        robot.drivetrain.stop()
@@ -0,0 +1,145 @@
+from wpilib.command import Command
+
+from trajectoryconstants import DriveConstants
+
+import robot
+import math
+import numpy
+
+
+class PurePursuitCommand(Command):
+    '''
+    Follows a polyline of waypoints with the pure pursuit algorithm. Cheaper
+    than generating a full trajectory, so it is handy for paths built on the
+    fly.
+    '''
+
+    def __init__(self, waypoints, lookahead=0.6, speed=1.5, deceleration=1.5, tolerance=0.05, searchWindow=10):
+        '''
+        waypoints: [[x1, y1], [x2, y2], ...] in meters, relative to where the
+                   robot is when the command starts. X is forward and Y is to
+                   the right, matching the clockwise navX.
+        lookahead: How far down the path to chase, in meters.
+        speed: Cruising speed in meters per second.
+        deceleration: Used to slow down for the end of the path, in m/s^2.
+        tolerance: How close to the last waypoint counts as done, in meters.
+        searchWindow: How many points past the last closest point to check.
+        '''
+
+        super().__init__('Pure Pursuit')
+
+        self.requires(robot.drivetrain)
+
+        self.waypoints = numpy.array(waypoints, dtype=float)
+
+        if self.waypoints.ndim != 2 or self.waypoints.shape[0] < 2 or self.waypoints.shape[1] != 2:
+            raise ValueError('Format the waypoints like so: [[x1, y1], [x2, y2], ...]')
+
+        '''
+        Precompute the distance along the path to every point, so the lookahead
+        point can be found with a binary search instead of a scan.
+        '''
+        segments = numpy.hypot(*numpy.diff(self.waypoints, axis=0).T)
+        self.arcLengths = numpy.concatenate(([0.0], numpy.cumsum(segments)))
+        self.totalLength = float(self.arcLengths[-1])
+        self.lastIndex = len(self.waypoints) - 1
+
+        self.lookahead = lookahead
+        self.speed = speed
+        self.deceleration = deceleration
+        self.tolerance = tolerance
+        self.searchWindow = searchWindow
+        self.minSpeed = 0.2 # Keeps the robot from stalling just short of the end.
+
+        self.halfTrack = DriveConstants.kTrackWidthMeters / 2
+
+    def initialize(self):
+        robot.drivetrain.updateOdometry()
+        pose = robot.drivetrain.getPoseMeters()
+
+        '''Move the path from the robot's frame into the odometry frame.'''
+        heading = pose.rotation().radians()
+        cosA = math.cos(heading)
+        sinA = math.sin(heading)
+
+        rotation = numpy.array([[cosA, sinA], [-sinA, cosA]])
+        self.path = self.waypoints.dot(rotation) + (pose.X(), pose.Y())
+
+        self.closestIndex = 0
+        self.remaining = self.totalLength
+
+    def execute(self):
+        pose = robot.drivetrain.getPoseMeters()
+
+        x = pose.X()
+        y = pose.Y()
+        heading = pose.rotation().radians()
+
+        self.closestIndex = self._findClosest(x, y)
+        lookX, lookY = self._findLookahead()
+
+        self.remaining = (self.totalLength - self.arcLengths[self.closestIndex]) + math.hypot(
+            self.path[self.closestIndex][0] - x,
+            self.path[self.closestIndex][1] - y
+        )
+
+        '''Sideways offset of the lookahead point, in the robot's frame.'''
+        dx = lookX - x
+        dy = lookY - y
+        lateral = -math.sin(heading) * dx + math.cos(heading) * dy
+        distanceSquared = max(dx * dx + dy * dy, self.lookahead ** 2) # Closer than that, small errors turn into huge curvatures.
+
+        curvature = (2 * lateral) / distanceSquared # Positive turns right.
+
+        speed = min(self.speed, math.sqrt(2 * self.deceleration * self.remaining))
+        speed = max(speed, self.minSpeed)
+
+        left = speed * (1 + curvature * self.halfTrack)
+        right = speed * (1 - curvature * self.halfTrack)
+
+        robot.drivetrain.setSpeeds(
+            -robot.drivetrain.metersPerSecondToUnits(left),
+            robot.drivetrain.metersPerSecondToUnits(right)
+        )
+
+    def isFinished(self):
+        return self.closestIndex == self.lastIndex and self.remaining <= self.tolerance
+
+    def end(self):
+        robot.drivetrain.stop()
+
+    def _findClosest(self, x, y):
+        '''
+        Only look a few points ahead of the last closest point. The robot can't
+        skip large chunks of the path, and this keeps us from snapping to a
+        later part of the path that happens to cross nearby.
+        '''
+
+        window = self.path[self.closestIndex:self.closestIndex + self.searchWindow + 1]
+        offsets = window - (x, y)
+
+        return self.closestIndex + int(numpy.argmin(numpy.einsum('ij,ij->i', offsets, offsets)))
+
+    def _findLookahead(self):
+        '''
+        Interpolates the point one lookahead distance down the path from the
+        closest point. The search only covers the rest of the path. Near the
+        end, the path is carried on straight past the last point, so the
+        lookahead never collapses onto the robot.
+        '''
+
+        target = self.arcLengths[self.closestIndex] + self.lookahead
+        if target >= self.totalLength:
+            last = self.path[-1] - self.path[-2]
+            length = math.hypot(last[0], last[1])
+            if length < 1e-9:
+                return self.path[-1]
+
+            return self.path[-1] + last * ((target - self.totalLength) / length)
+
+        index = self.closestIndex + int(numpy.searchsorted(self.arcLengths[self.closestIndex:], target, side='right'))
+
+        start = self.arcLengths[index - 1]
+        fraction = (target - start) / max(self.arcLengths[index] - start, 1e-9)
+
+        return self.path[index - 1] + (self.path[index] - self.path[index - 1]) * fraction
@@ -0,0 +1,98 @@
+from wpilib.command import Command
+
+from wpilib import Timer
+
+import robot
+import statistics
+
+
+class CalibrateHoodLashCommand(Command):
+    '''
+    Measures the hood's gear lash. The hood is brought down so the gears sit on
+    the lower side of the lash, then driven up slowly. Until the gears catch,
+    the motor only spins the gearbox and barely draws current; when they
+    catch it starts lifting the hood and the current jumps. The distance the
+    reading moved before that is the lash. Runs a few times and keeps the
+    median.
+    '''
+
+    def __init__(self, runs=3, speed=0.08, currentRise=1.5):
+        '''
+        speed: Output used to creep up through the lash.
+        currentRise: Amps above the free spinning current that mean the gears caught.
+        '''
+
+        super().__init__('Calibrate Hood Lash')
+
+        self.requires(robot.hood)
+
+        self.runs = runs
+        self.speed = speed
+        self.currentRise = currentRise
+
+        self.start = (robot.hood.angleMin + robot.hood.angleMax) / 2
+        self.settleTime = 0.1 # Seconds of inrush current to ignore.
+        self.maxTravel = 20 # Degrees. Give up on a run if the gears never catch.
+
+    def initialize(self):
+        self.measurements = []
+        self.failed = False
+        self._setStage('center')
+
+    def _setStage(self, stage):
+        self.stage = stage
+        self.stageStart = Timer.getFPGATimestamp()
+
+    def execute(self):
+        elapsed = Timer.getFPGATimestamp() - self.stageStart
+
+        if self.stage == 'center':
+            robot.hood.setPosition(self.start)
+
+            if robot.hood.atTarget():
+                self._setStage('down')
+
+        elif self.stage == 'down': # Take up the lash on the lower side.
+            robot.hood.setPercent(-self.speed)
+
+            if elapsed >= 0.5:
+                robot.hood.stopHood()
+                self._setStage('rest')
+
+        elif self.stage == 'rest':
+            if elapsed >= 0.25:
+                robot.hood.setPercent(self.speed)
+                self.startPosition = robot.hood.getPosition()
+                self.freeCurrent = None
+                self._setStage('up')
+
+        elif self.stage == 'up':
+            robot.hood.setPercent(self.speed)
+
+            if elapsed < self.settleTime:
+                return
+
+            current = robot.hood.motor.getOutputCurrent()
+            travel = robot.hood.getPosition() - self.startPosition
+
+            if self.freeCurrent is None or current < self.freeCurrent:
+                self.freeCurrent = current
+
+            elif current >= self.freeCurrent + self.currentRise:
+                self.measurements.append(travel)
+                robot.hood.stopHood()
+                self._setStage('center')
+
+            elif travel >= self.maxTravel:
+                self.failed = True
+
+    def isFinished(self):
+        return self.failed or len(self.measurements) >= self.runs
+
+    def end(self):
+        robot.hood.stopHood()
+
+        if self.measurements and not self.failed:
+            robot.hood.setLash(statistics.median(self.measurements))
+
+        robot.hood.table.putNumber('Lash', robot.hood.getLash())
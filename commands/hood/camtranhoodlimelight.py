@@ -23,7 +23,7 @@ class CamTranHoodLimelight(Command):
         self.goal = robot.hood.benSetAngle(robot.limelight.getY())
 
     def isFinished(self):
-        return ((not robot.hood.withinBounds()) or (abs(self.goal - robot.hood.getPosition()) <= 3))
+        return ((not robot.hood.withinBounds()) or robot.hood.atTarget())
 
     def end(self):
         robot.hood.stopHood()
@@ -15,7 +15,7 @@ class HoodLimelightCommand(Command):
 
     def initialize(self):
         #print('ran?')
-        robot.limelight.setPipeline(0)
+        robot.limelight.requestPipeline(0)
 
     def execute(self):
         if robot.hood.withinBounds() and robot.limelight.getTape():
@@ -33,7 +33,7 @@ class HoodLimelightCommand(Command):
         #print('DONE?!?!?')
         robot.hood.stopHood()
 
-        robot.limelight.setPipeline(1)
+        robot.limelight.releasePipeline(0)
 
         self.isHoodAligned = False
         
@@ -9,44 +9,13 @@ class SetHoodCommand(Command):
 
         self.requires(robot.hood)
 
-        realAngle = robot.hood.angleMin + (2 * angle)
-
-        self.angle = realAngle
-        self.oldAngle = realAngle
-
-        self.dir = 'u'
+        self.angle = robot.hood.angleMin + (2 * angle)
 
     def initialize(self):
-        self.angle = self.oldAngle
-        if robot.hood.getPosition() >= self.angle:
-            self.speed = -0.3
-            self.dir = 'd'
-            self.angle += 5 # compensating for gear lash
-        else:
-            self.speed = 0.3
-            self.dir = 'u'
-            self.angle -= 5
-
-        #print(self.dir)
-        if abs(robot.hood.getPosition() - self.angle) < 1:
-            robot.hood.stopHood()
-
-        else:
-            robot.hood.setPercent((self.speed))
-
-
-    def execute(self):
-        #print(robot.hood.getPosition())
-        if (robot.hood.getPosition() <= self.angle and self.dir == 'd') or (robot.hood.getPosition() >= self.angle and self.dir == 'u'):
-            robot.hood.stopHood()
-        else:
-            robot.hood.setPercent((self.speed))
+        robot.hood.setPosition(self.angle)
 
     def isFinished(self):
-        if abs(robot.hood.getPosition() - self.angle) <= 1:
-            return True
-
-        return False
+        return robot.hood.atTarget()
 
     def end(self):
         robot.hood.stopHood()
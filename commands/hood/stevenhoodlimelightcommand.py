@@ -12,15 +12,13 @@ class StevenHoodLimelightCommand(Command):
 
 
     def initialize(self):
-        robot.limelight.setPipeline(0)
+        robot.limelight.requestPipeline(0)
 
 
     def execute(self):
         if robot.limelight.getTape():
-            if (robot.limelight.getA() > 1.289):
-                robot.hood.setShootAngle(1.76491 * (robot.limelight.getA() * robot.limelight.getA()) + 20 + robot.hood.getAdjustment())
-            else:
-                robot.hood.setShootAngle(1.76491 * (robot.limelight.getA() * robot.limelight.getA()) + 20 +robot.hood.getAdjustment())
+            angle = robot.shooter.shotMap.getHoodAngle(robot.limelight.getDistance())
+            robot.hood.setShootAngle(angle + robot.hood.getAdjustment())
 
         else:
             robot.hood.stopHood()
@@ -28,5 +26,5 @@ class StevenHoodLimelightCommand(Command):
         robot.hood.updateNetworkTables()
         
     def end(self):
-        robot.limelight.setPipeline(1)
+        robot.limelight.releasePipeline(0)
         robot.hood.stopHood()
@@ -1,6 +1,7 @@
 from wpilib.command import Command
 
 import robot
+import math
 
 
 class AimTurretDrivebaseCommand(Command):
@@ -13,12 +14,12 @@ class AimTurretDrivebaseCommand(Command):
 
 
     def initialize(self):
-        robot.limelight.setPipeline(1)
+        robot.limelight.requestPipeline(1)
 
 
     def execute(self):
         #print("aiming")
-        if (robot.turret.isZeroed() or robot.turret.isMax()):
+        if (robot.turret.isMin() or robot.turret.isMax()):
             self.UseDriveTrain = True
         else:
             self.UseDriveTrain = False
@@ -34,6 +35,6 @@ class AimTurretDrivebaseCommand(Command):
 
 
     def end(self):
-        robot.limelight.setPipeline(0)
+        robot.limelight.releasePipeline(1)
         robot.drivetrain.stop()
         robot.turret.stop()
@@ -12,7 +12,7 @@ class llTestCommand(Command):
         self.requires(robot.turret)
 
     def initialize(self):
-        robot.limelight.setPipeline(1)
+        robot.limelight.requestPipeline(1)
         self.tx = -65
         self.ty = 180
         self.deltaX = 0
@@ -72,7 +72,7 @@ class llTestCommand(Command):
 
 
     def end(self):
-        robot.limelight.setPipeline(0)
+        robot.limelight.releasePipeline(1)
         robot.drivetrain.stop()
         robot.turret.stop()
 
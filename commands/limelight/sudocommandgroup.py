@@ -7,18 +7,32 @@ from commands.shooter.stevenshooterlimelightcommand import StevenShooterLimeligh
 from commands.turret.turretlimelightcommand import TurretLimelightCommand
 from commands.turret.camtranturretlimelight import CamTranTurretLimelight
 from commands.shooter.shootwhenreadycommand import ShootWhenReadyCommand
+from commands.shooter.shootonthemovecommand import ShootOnTheMoveCommand
 from commands.revolver.firesequencecommand import FireSequenceCommand
 
 class SudoCommandGroup(CommandGroup):
 
-    def __init__(self, autoEnd=True):
+    def __init__(self, autoEnd=True, onTheMove=False):
+        '''onTheMove: Lead the shot for our speed, so we don't have to stop to shoot.'''
+
         super().__init__('Sudo')
 
         # Add commands here with self.addSequential() and self.addParallel()
         #self.addParallel(CamTranTurretLimelight())
-        self.addParallel(TurretLimelightCommand())
-        self.addParallel(StevenHoodLimelightCommand())
-        self.addParallel(StevenShooterLimelightCommand())
-        self.addSequential(FireSequenceCommand(autoEnd))
+        if onTheMove:
+            self.addParallel(ShootOnTheMoveCommand())
+        else:
+            self.addParallel(TurretLimelightCommand())
+            self.addParallel(StevenHoodLimelightCommand())
+            self.addParallel(StevenShooterLimelightCommand())
+
+        self.fireSequence = FireSequenceCommand(autoEnd)
+        self.addSequential(self.fireSequence)
         #self.addParallel(ShootWhenReadyCommand())
 
+    def initialize(self):
+        self.fireSequence.complete = False
+
+    def isFinished(self):
+        '''The aiming commands never finish, so stop them all once the last ball is out.'''
+        return self.fireSequence.complete
@@ -83,7 +83,10 @@ class DefaultCommand(Command):
                 robot.ledsystem.setWhite()
                 
             elif robot.intake.intaking:
-                robot.ledsystem.setBlue()
+                if robot.revolver.isFull():
+                    robot.ledsystem.setYellow() # Full, so stop intaking.
+                else:
+                    robot.ledsystem.setBlue()
                 
             else:
                 robot.ledsystem.rainbowLava() # The default, good to go setting.
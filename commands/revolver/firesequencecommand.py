@@ -1,11 +1,19 @@
 from wpilib.command import Command
 
+from wpilib import Timer
+
 import robot
 
 
 class FireSequenceCommand(Command):
 
-    def __init__(self, autoEnd):
+    def __init__(self, autoEnd, balls=None):
+        '''
+        autoEnd: Finish after the last ball leaves the flywheel.
+        balls: How many balls we are shooting, if we know. Otherwise we finish
+               when the revolver looks empty.
+        '''
+
         super().__init__('Fire Sequence')
 
         self.requires(robot.revolver)
@@ -16,9 +24,16 @@ class FireSequenceCommand(Command):
 
         self.beganLaunching = False
         self.autoEnd = autoEnd
+        self.balls = balls
+
+        self.settleTime = 0.25 # Seconds without a ball before we believe the revolver is empty.
+        self.complete = False
 
     def initialize(self):
         self.proceed = False
+        self.complete = False
+
+        self.startShots = robot.shooter.getShotCount()
         
         robot.revolver.sequenceEngaged = True
         
@@ -36,56 +51,43 @@ class FireSequenceCommand(Command):
         #if abs(self.goTo - robot.revolver.getPosition()) <= 5 and robot.turret.onTarget and not self.proceed:# and all(abs(x) <= 10 for x in robot.drivetrain.getSpeeds()):
             #self.proceed = True
         
-        if robot.shooter.atGoal: #and robot.revolver.inDropZone() and self.proceed:
+        if robot.firecontrol.isReady(): # Target, turret, hood and flywheel all lined up.
             robot.revolver.setStaticSpeed()
             robot.balllauncher.launchBalls()
             robot.pneumatics.extendBallLauncherSolenoid()
             self.launchingBegun = True
 
+        else: # Hold the next ball back until everything is lined up again.
+            robot.balllauncher.stopLauncher()
+            robot.pneumatics.retractBallLauncherSolenoid()
+
     def isFinished(self):
-        self.current = robot.revolver.getPosition()
-        
-        self.beganLaunching = True
-        self.loopedOnce = False
-        self.shootUntil = robot.revolver.getPosition() + 15 # Invert if need to reverse.
-        self.lastPos = robot.revolver.getPosition()
-        
-    #def isFinished(self):
-        #if self.beganLaunching and self.autoEnd:
-            #if self.loopedOnce:
-                #if robot.revolver.getPosition() > self.shootUntil: # Might need to invert. 
-                    #return True # We done. 
-            #else:
-                #if self.lastPos > robot.revolver.getPosition(): # The revolver just went from 359 to 0. Might need to invert.
-                    #self.loopedOnce = True 
-                    
-                #self.lastPos = robot.revolver.getPosition()
-        
-        #return False
-    
-    #def isFinishedV2(self): # I thought of an issue; if the grabber skips a ball, it won't shoot it. Try both?
-        #if self.beganLaunching and self.autoEnd:
-            #if not robot.revolver.sawItAt() == -1:
-                #lastSeen = robot.revolver.sawItAt()
-                #self.loopedOnce = False # Found a new target, so reset this. 
-            
-            #if self.loopedOnce:
-                #if robot.revolver.getPosition() > self.shootUntil: # Might need to invert. 
-                    #return True # We done. 
-            #else:
-                #if self.lastPos > robot.revolver.getPosition(): # The revolver just went from 359 to 0. Might need to invert.
-                    #self.loopedOnce = True 
-                    
-                #self.lastPos = robot.revolver.getPosition()
-        
-        #return False
+        '''
+        Done once the revolver is empty and the last ball has had time to
+        clear the flywheel, or once we have counted all the balls we were told
+        we had.
+        '''
+
+        if not self.autoEnd:
+            return False
+
+        shots = robot.shooter.getShotCount() - self.startShots
+        if shots <= 0:
+            return False
+
+        if self.balls is not None and shots >= self.balls:
+            self.complete = True
+
+        elif robot.revolver.isEmpty() and Timer.getFPGATimestamp() - robot.shooter.getLastExitTime() >= self.settleTime:
+            self.complete = True
+
+        return self.complete
 
     def end(self):
         robot.revolver.sequenceEngaged = False
         self.proceed = False
         
         self.beganLaunching = False
-        self.loopedOnce = False
 
         robot.pneumatics.retractBallLauncherSolenoid()
         robot.balllauncher.stopLauncher()
@@ -0,0 +1,53 @@
+from wpilib.command import Command
+
+from wpilib import Timer, RobotBase
+
+import robot
+import os
+
+
+class CharacterizeShooterCommand(Command):
+    '''
+    Steps the flywheel through a few voltages and logs time, volts, rpm to a
+    CSV for custom/flywheelmodel.py to fit. Needs at least two voltage levels
+    or kS and kV can't be told apart.
+    '''
+
+    def __init__(self, steps=(4, 8), stepTime=3.0, path=None):
+        super().__init__('Characterize Shooter')
+
+        self.requires(robot.shooter)
+
+        if path is None:
+            path = 'shooterstep.csv' if RobotBase.isSimulation() else '/home/lvuser/py/shooterstep.csv'
+
+        self.steps = steps
+        self.stepTime = stepTime
+        self.path = path
+
+    def initialize(self):
+        self.rows = []
+        self.startTime = Timer.getFPGATimestamp()
+
+    def execute(self):
+        elapsed = Timer.getFPGATimestamp() - self.startTime
+        step = min(int(elapsed // self.stepTime), len(self.steps) - 1)
+
+        robot.shooter.setVoltage(self.steps[step])
+
+        self.rows.append((elapsed, robot.shooter.getOutputVoltage(), abs(robot.shooter.getRPM())))
+
+    def isFinished(self):
+        return Timer.getFPGATimestamp() - self.startTime >= self.stepTime * len(self.steps)
+
+    def end(self):
+        robot.shooter.stopShooter()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with open(self.path, 'w') as f:
+            f.write('# time, volts, rpm\n')
+            for row in self.rows:
+                f.write('%.4f,%.3f,%.1f\n' % row)
@@ -18,4 +18,4 @@ class EndShootingProcessCommand(InstantCommand):
         self.requires(robot.balllauncher)
 
     def initialize(self):
-        robot.limelight.setPipeline(1)
+        robot.limelight.releaseAllPipelines()
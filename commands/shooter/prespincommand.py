@@ -0,0 +1,101 @@
+from wpilib.command import Command
+
+from wpilib import RobotController
+
+import fieldconstants
+import robot
+import math
+
+
+class PreSpinCommand(Command):
+    '''
+    Default for the shooter. Watches where we are heading and starts the
+    flywheel just early enough that it is at speed when we get into range,
+    so the first shot doesn't wait out the whole spin-up. Whatever command
+    takes the shooter inherits the speed.
+    '''
+
+    def __init__(self):
+        super().__init__('Pre Spin')
+
+        self.requires(robot.shooter)
+
+        self.margin = 0.3 # Seconds early, in case the model is optimistic.
+        self.minClosingSpeed = 12 # Inches per second toward the goal to count as heading there.
+        self.zoneMargin = 24 # Inches out of the zone before we give up.
+
+        '''
+        Volts. Below minBattery the drive needs it more than we do. The
+        flywheel itself sags the battery, so we don't try again until it
+        has come back up past resumeBattery.
+        '''
+        self.minBattery = 10.5
+        self.resumeBattery = 11.5
+        self.batteryLow = False
+
+    def initialize(self):
+        self.spinning = False
+
+    def execute(self):
+        distance, closingSpeed = self.getApproach()
+        zone = fieldconstants.ShootingZone
+
+        rpm = robot.shooter.shotMap.getRPM(min(max(distance, zone.near), zone.far))
+
+        if self.shouldSpin(distance, closingSpeed, zone, rpm):
+            robot.shooter.setRPM(rpm)
+            self.spinning = True
+
+        elif self.spinning:
+            robot.shooter.stopShooter()
+            self.spinning = False
+
+    def getApproach(self):
+        '''Inches to the goal and how fast we are closing on it, from odometry.'''
+
+        pose = robot.drivetrain.getPoseMeters()
+        distance = math.hypot(
+            fieldconstants.Goal.x - pose.translation().X(),
+            fieldconstants.Goal.y - pose.translation().Y()
+        ) * 39.37
+
+        speeds = robot.drivetrain.getWheelSpeeds()
+        forward = (speeds.left + speeds.right) / 2 * 39.37
+
+        return distance, forward * math.cos(math.radians(robot.turret.getGoalBearing()))
+
+    def shouldSpin(self, distance, closingSpeed, zone, rpm):
+        '''
+        Spinning stops the compressor (see the pneumatics DefaultCommand), so
+        we leave it be while the air is low, and we don't pull on a battery
+        that is already sagging.
+        '''
+
+        battery = RobotController.getBatteryVoltage()
+
+        if battery < self.minBattery:
+            self.batteryLow = True
+        elif battery > self.resumeBattery:
+            self.batteryLow = False
+
+        if self.batteryLow:
+            return False
+
+        if robot.pneumatics.isPressureLow() or robot.revolver.getBallCount() == 0:
+            return False
+
+        if zone.near <= distance <= zone.far:
+            return True
+
+        if self.spinning:
+            return zone.near - self.zoneMargin <= distance <= zone.far + self.zoneMargin
+
+        if distance < zone.near or closingSpeed < self.minClosingSpeed: # Only spin up on the way in from out past the zone.
+            return False
+
+        timeToZone = (distance - zone.far) / closingSpeed
+
+        return timeToZone <= robot.shooter.getSpinUpTime(rpm) + self.margin
+
+    def end(self):
+        self.spinning = False # Leave it running for whoever took over.
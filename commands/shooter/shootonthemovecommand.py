@@ -0,0 +1,85 @@
+from wpilib.command import Command
+
+from custom.movingshotsolver import MovingShotSolver
+
+import robot
+import math
+
+
+class ShootOnTheMoveCommand(Command):
+    '''
+    Aims the turret, hood and flywheel together so we can shoot while driving.
+    Every tick the moving shot solver turns the Limelight's distance and
+    bearing, plus our speed, into a lead for the turret and the RPM and hood
+    angle for the virtual goal.
+    '''
+
+    def __init__(self):
+        super().__init__('Shoot On The Move')
+
+        self.requires(robot.turret)
+        self.requires(robot.hood)
+        self.requires(robot.shooter)
+
+        self.solver = MovingShotSolver(robot.shooter.shotMap)
+
+        self.turretP = 0.03
+        self.turretSpeedLimit = 0.3
+        self.aimTolerance = 3.0 # Degrees.
+
+    def initialize(self):
+        robot.limelight.requestPipeline(0)
+
+        robot.turret.onTarget = False
+        robot.shooter.atGoal = False
+
+        self.rpm = 0
+
+    def execute(self):
+        if robot.limelight.getTape():
+            speeds = robot.drivetrain.getWheelSpeeds()
+            forward = (speeds.left + speeds.right) / 2 * 39.37 # Inches per second.
+
+            x = robot.limelight.getCompensatedX()
+            bearing = robot.turret.getRobotAngle() + x
+
+            if not robot.turret.isZeroed(): # No idea which way the goal is from the robot, so don't lead it.
+                bearing = x
+                forward = 0
+
+            self.rpm, hoodAngle, lead = self.solver.solve(robot.limelight.getDistance(), bearing, forward)
+
+            robot.firecontrol.lead = lead
+
+            error = x + robot.turret.getAdjustment() + lead
+            rotate = error * self.turretP
+            robot.turret.move(math.copysign(min(abs(rotate), self.turretSpeedLimit), rotate))
+
+            robot.hood.setShootAngle(hoodAngle + robot.hood.getAdjustment())
+
+            robot.turret.onTarget = abs(error) <= self.aimTolerance
+
+        else: # Hold the flywheel and hood, but don't swing the turret around blind.
+            robot.turret.stop()
+            robot.turret.onTarget = False
+
+        robot.shooter.setRPM(self.rpm)
+        robot.shooter.updateReadiness()
+
+        robot.turret.updateNetworkTables()
+        robot.hood.updateNetworkTables()
+        robot.shooter.updateNetworkTables()
+
+    def end(self):
+        robot.firecontrol.lead = 0
+
+        robot.turret.stop()
+        robot.turret.onTarget = False
+
+        robot.hood.stopHood()
+
+        robot.shooter.atGoal = False
+        robot.shooter.stopShooter()
+        robot.shooter.zeroNetworkTables()
+
+        robot.limelight.releasePipeline(0)
@@ -9,6 +9,7 @@ class ShootWhenReadyCommand(Command):
 
         self.requires(robot.balllauncher)
         self.requires(robot.revolver)
+        self.requires(robot.shooter)
 
         self.targetRPM = 6000#targetRPM
         self.tol = tol
@@ -26,7 +27,7 @@ class ShootWhenReadyCommand(Command):
         robot.pneumatics.retractBallLauncherSolenoid()
         
         if not self.ignoreLimelight: #we don't need to do any limelight stuff if ignoreLimelight is true
-            robot.limelight.setPipeline(0)
+            robot.limelight.requestPipeline(0)
             
         robot.shooter.setRPM(self.targetRPM)
 
@@ -36,21 +37,15 @@ class ShootWhenReadyCommand(Command):
         if self.targetLocated or self.ignoreLimelight: # If we found one (or don't need one), lock in and proceed.
             robot.revolver.setStaticSpeed()
             #print("located targeb; rpm = " + str(robot.shooter.getRPM()) + "; target rpm = " + str(self.targetRPM) + " (" + str(self.tol) + " tolerance)")
-            if abs(robot.shooter.getRPM()) + self.tol >= self.targetRPM and robot.revolver.inDropZone():
+            if robot.shooter.isReady() and robot.revolver.inDropZone():
                 robot.balllauncher.launchBalls() 
                 robot.pneumatics.extendBallLauncherSolenoid()
                 #print("Heck")
                 
         elif robot.limelight.getTape(): # Search for a target until we find one; will not run if ignoreLimelight is true.
             #print('weird')
-            if robot.limelight.getA() > self.swapArea: # Dummy value. Close shot, static rpm and align the axises. Find the limit tho.
-                robot.shooter.setRPM(3800)
-                robot.limelight.closeShot = True
-                #print('closeshot')
-            else:
-                robot.shooter.setRPM(robot.limelight.generateVelocity(robot.limelight.getA(), self.swapArea))
-                robot.limelight.closeShot = False
-                #print("farshot")
+            robot.shooter.setRPM(robot.shooter.shotMap.getRPM(robot.limelight.getDistance()))
+            robot.limelight.closeShot = robot.limelight.getA() > self.swapArea # Close shots align the axises.
                 
             self.targetLocated = True
 
@@ -65,4 +60,5 @@ class ShootWhenReadyCommand(Command):
         
         robot.revolver.resetRevolverEncoder()
 
-        robot.limelight.setPipeline(1)
+        if not self.ignoreLimelight:
+            robot.limelight.releasePipeline(0)
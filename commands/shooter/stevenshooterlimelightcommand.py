@@ -15,13 +15,14 @@ class StevenShooterLimelightCommand(Command):
 
     def initialize(self):
         robot.shooter.atGoal = False
-        robot.limelight.setPipeline(0)
+        robot.limelight.requestPipeline(0)
+
+        self.speed = 0
 
     def execute(self):
-        self.speed = 5600 * robot.limelight.getA()
-        if self.speed > 5600:
-            self.speed = 5600
-            
+        if robot.limelight.getTape(): # Hold the last speed if we lose the target.
+            self.speed = robot.shooter.shotMap.getRPM(robot.limelight.getDistance())
+
         #print(str(self.speed) + " t " + str(robot.shooter.getRPM())) 
             
         robot.shooter.setRPM(self.speed)
@@ -30,11 +31,10 @@ class StevenShooterLimelightCommand(Command):
         
         #print('rpm ' + str(robot.shooter.getRPM()))
         
-        if abs(robot.shooter.getRPM()) + 300 >= self.speed: # Only needs to pass this once. Adds a tolerance of 30, in case it hovers below.
-            robot.shooter.atGoal = True
+        robot.shooter.updateReadiness() # Clears after each shot until the flywheel recovers.
 
     def end(self):
         robot.shooter.atGoal = False
-        robot.limelight.setPipeline(1)
+        robot.limelight.releasePipeline(0)
         robot.shooter.stopShooter()
         robot.shooter.zeroNetworkTables()
@@ -4,20 +4,33 @@ import robot
 
 
 class FieldOrientationTurretCommand(Command):
+    '''
+    Keeps the turret pointed the same way on the field while the robot drives
+    and spins, so the goal stays in the Limelight's view.
+    '''
+
+    def __init__(self, fieldAngle=None):
+        '''
+        fieldAngle: The turret position to hold with the gyro at zero. By
+                    default, hold wherever the turret points when we start.
+        '''
 
-    def __init__(self):
         super().__init__('Field Orientation Turret')
 
         self.requires(robot.turret)
 
+        self.fieldAngle = fieldAngle
 
     def initialize(self):
-        pass
-
+        if self.fieldAngle is None:
+            robot.turret.captureOrientation()
+        else:
+            robot.turret.fieldAngle = self.fieldAngle
 
     def execute(self):
-        pass
-
+        robot.turret.trackFieldAngle()
+        robot.turret.updateNetworkTables()
 
     def end(self):
-        pass
+        robot.turret.stop()
+        robot.turret.onTarget = False
@@ -0,0 +1,19 @@
+from wpilib.command import InstantCommand
+
+import robot
+
+
+class SetTurretStraightAheadCommand(InstantCommand):
+    '''
+    Line the shooter up with the front of the robot, then run this to store
+    that as straight ahead. Only means anything once the turret is zeroed.
+    '''
+
+    def __init__(self):
+        super().__init__('Set Turret Straight Ahead')
+
+        self.requires(robot.turret)
+
+    def initialize(self):
+        if robot.turret.isZeroed():
+            robot.turret.setStraightAhead()
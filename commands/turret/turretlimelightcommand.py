@@ -11,11 +11,21 @@ class TurretLimelightCommand(Command):
         self.requires(robot.turret)
 
     def initialize(self):
-        robot.limelight.setPipeline(0)
+        robot.limelight.requestPipeline(0)
         robot.turret.onTarget = False
 
     def execute(self):
-        self.x = robot.limelight.getX() + robot.turret.getAdjustment()
+        if not robot.limelight.getTape():
+            if robot.turret.isZeroed(): # Until then we don't know where the turret points.
+                robot.turret.preAim()
+            else:
+                robot.turret.stop()
+
+            robot.turret.onTarget = False
+            robot.turret.updateNetworkTables()
+            return
+
+        self.x = robot.limelight.getCompensatedX() + robot.turret.getAdjustment() # Where the goal is now, not when the frame was taken.
         self.rotate = self.x * 0.03
         self.speedLimit = .3
         if (abs(self.rotate) > self.speedLimit):
@@ -25,10 +35,14 @@ class TurretLimelightCommand(Command):
 
         robot.turret.move(self.rotate)
 
-        robot.turret.onTarget = (abs(robot.limelight.getX()) <= 3.0)
+        robot.turret.onTarget = (abs(robot.limelight.getCompensatedX()) <= 3.0)
+
+        if robot.turret.isZeroed(): # Until then the turret angle means nothing.
+            robot.turret.correctGoalBearing(robot.turret.getRobotAngle() + robot.limelight.getCompensatedX())
+
         robot.turret.updateNetworkTables()
 
     def end(self):
         robot.turret.stop()
         robot.turret.onTarget = False
-        robot.limelight.setPipeline(1)
+        robot.limelight.releasePipeline(0)
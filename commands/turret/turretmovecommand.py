@@ -15,13 +15,7 @@ class TurretMoveCommand(Command):
 
     def execute(self):
         direction = logicalaxes.turretX.get() * -0.85 # This is actually 75%; the deadband calculator in accelMove drops it by the deadband (0.1)
-        if (not robot.turret.isLimitSwitch() and not robot.turret.isMin()) or \
-            (robot.turret.isLimitSwitch() and direction >= 0) or \
-            (robot.turret.isMin() and direction <= 0):
-            robot.turret.accelMove(direction*0.5)
-            
-        else:
-            robot.turret.stop()
+        robot.turret.accelMove(direction*0.5) # The Talon's soft limits keep us in range.
 
     def end(self):
         robot.turret.stop()
@@ -0,0 +1,39 @@
+class ButtonDispatcher:
+    '''
+    Fires button bindings on press and release edges. Each loop the new button
+    mask is XORed with the last one, and only the bindings for bits that
+    changed are run, so an idle controller costs one comparison no matter how
+    many bindings it has.
+    '''
+
+    def __init__(self):
+        self.lastButtons = 0
+
+        '''Bit number -> list of callables.'''
+        self.pressActions = {}
+        self.releaseActions = {}
+
+    def onPress(self, id, action):
+        self.pressActions.setdefault(id, []).append(action)
+
+    def onRelease(self, id, action):
+        self.releaseActions.setdefault(id, []).append(action)
+
+    def dispatch(self, buttons):
+        changed = buttons ^ self.lastButtons
+        if not changed:
+            return
+
+        released = changed & self.lastButtons
+        self.lastButtons = buttons
+
+        self._fire(changed & buttons, self.pressActions)
+        self._fire(released, self.releaseActions)
+
+    def _fire(self, bits, actions):
+        while bits:
+            lowest = bits & -bits
+            bits ^= lowest
+
+            for action in actions.get(lowest.bit_length() - 1, ()):
+                action()
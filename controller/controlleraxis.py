@@ -1,13 +1,14 @@
 class ControllerAxis:
     '''Represents an axis of a joystick.'''
 
-    def __init__(self, controller, id, isInverted):
+    def __init__(self, controller, id):
         '''
-        An axis is considered inverted if pushing up gives a negative result.
-        In that case, we multiply its value by -1 before returning it.
+        Reads from the controller's snapshot, which already multiplies inverted
+        axes (pushing up gives a negative result) by -1.
         '''
 
-        if isInverted:
-            self.get = lambda: -1 * controller.getRawAxis(id)
-        else:
-            self.get = lambda: controller.getRawAxis(id)
+        self.axes = controller.axes
+        self.id = id
+
+    def get(self):
+        return self.axes[self.id]
@@ -1 +1,44 @@
- 
+from wpilib.buttons import Button
+
+class ControllerButton(Button):
+    '''
+    A button that reads from its controller's snapshot. Bindings are handed to
+    the controller's ButtonDispatcher rather than the Scheduler, so they only
+    cost anything on the loop where the button changes.
+    '''
+
+    def __init__(self, controller, id):
+        super().__init__()
+
+        self.controller = controller
+        self.id = id
+        self.mask = 1 << id
+
+    def get(self):
+        '''Whether the button is pressed or not.'''
+
+        return (self.controller.buttons & self.mask) != 0
+
+    def whenPressed(self, command):
+        self.controller.dispatcher.onPress(self.id, command.start)
+
+    def whileHeld(self, command):
+        '''Starts when pressed and is cancelled when released.'''
+
+        self.controller.dispatcher.onPress(self.id, command.start)
+        self.controller.dispatcher.onRelease(self.id, command.cancel)
+
+    def whenReleased(self, command):
+        self.controller.dispatcher.onRelease(self.id, command.start)
+
+    def toggleWhenPressed(self, command):
+        def toggle():
+            if command.isRunning():
+                command.cancel()
+            else:
+                command.start()
+
+        self.controller.dispatcher.onPress(self.id, toggle)
+
+    def cancelWhenPressed(self, command):
+        self.controller.dispatcher.onPress(self.id, command.cancel)
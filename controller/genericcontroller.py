@@ -1,7 +1,13 @@
-from wpilib import Joystick
-from wpilib.buttons import JoystickButton
+from wpilib import Joystick, DriverStation, Timer
+
+from array import array
+import os
+import time
 
 from .controlleraxis import ControllerAxis
+from .controllerbutton import ControllerButton
+from .buttondispatcher import ButtonDispatcher
+from .inputrecorder import InputRecorder
 from .povbutton import POVButton
 
 class GenericController(Joystick):
@@ -11,6 +17,24 @@ class GenericController(Joystick):
     namedAxes = {}
     invertedAxes = []
 
+    '''Every controller that has been created, so they can be read together.'''
+    controllers = []
+    tick = 0
+
+    '''
+    By convention, the DPad buttons are 20 through 23. The POV angle is turned
+    into bits 20 through 23 of the button mask, so DPad buttons are read the
+    same way as any other button. Diagonals press both neighbouring buttons.
+    '''
+    povBits = {-1: 0}
+    for angle in range(0, 360, 45):
+        povBits[angle] = 0
+        for dpad in range(4):
+            if min(abs(angle - dpad * 90), 360 - abs(angle - dpad * 90)) <= 45:
+                povBits[angle] |= 1 << (20 + dpad)
+
+    del angle, dpad
+
     def __init__(self, port):
         '''
         Creates attributes of this class for every button and axis defined in
@@ -20,18 +44,105 @@ class GenericController(Joystick):
 
         super().__init__(port)
 
+        self.port = port
+        self.ds = DriverStation.getInstance()
+
+        '''
+        The latest reading of every axis, button and the POV. Axes are stored
+        already inverted. Bit n of buttons is button n.
+        '''
+        self.axisCount = max(self.namedAxes.values(), default=-1) + 1
+        self.axes = array('d', [0.0] * self.axisCount)
+        self.axisSigns = array('d', [1.0] * self.axisCount)
+        self.buttons = 0
+        self.pov = -1
+
+        self.dispatcher = ButtonDispatcher()
+        self.recorder = None
+
         for name, id  in self.namedButtons.items():
             if id >= 20:
-                '''
-                By convention, the DPad buttons are 20 through 23 and can be
-                converted to POV angles by the formula below.
-                '''
-                
                 angle = (id - 20) * 90
                 self.__dict__[name] = POVButton(self, angle)
             else:
-                self.__dict__[name] = JoystickButton(self, id)
+                self.__dict__[name] = ControllerButton(self, id)
 
         for name, id in self.namedAxes.items():
-            isInverted = name in self.invertedAxes
-            self.__dict__[name] = ControllerAxis(self, id, isInverted)
+            if name in self.invertedAxes:
+                self.axisSigns[id] = -1.0
+
+            self.__dict__[name] = ControllerAxis(self, id)
+
+        GenericController.controllers.append(self)
+
+    def update(self):
+        '''
+        Reads all axes, buttons and the POV at once, records them if asked to,
+        then fires any bindings whose buttons changed. Everything bound to this
+        controller reads from this snapshot, so the cost doesn't grow with the
+        number of bindings.
+        '''
+
+        self._read()
+
+        if self.recorder is not None:
+            self.recorder.write(
+                GenericController.tick,
+                Timer.getFPGATimestamp(),
+                self.buttons,
+                self.pov,
+                self.axes
+            )
+
+        self.dispatcher.dispatch(self.buttons)
+
+    def _read(self):
+        '''Fills in the snapshot from the DriverStation.'''
+
+        ds = self.ds
+        port = self.port
+        axes = self.axes
+        signs = self.axisSigns
+
+        for id in range(self.axisCount):
+            axes[id] = ds.getStickAxis(port, id) * signs[id]
+
+        self.pov = ds.getStickPOV(port, 0)
+        self.buttons = (ds.getStickButtons(port) << 1) | self.povBits.get(self.pov, 0)
+
+    def startRecording(self, path):
+        '''Writes every snapshot to the given file until stopRecording.'''
+
+        self.stopRecording()
+        self.recorder = InputRecorder(path, self.axisCount)
+
+    def stopRecording(self):
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+    @classmethod
+    def updateAll(cls):
+        '''Call once per loop, before the Scheduler runs.'''
+
+        cls.tick += 1
+
+        for controller in cls.controllers:
+            controller.update()
+
+    @classmethod
+    def startRecordingAll(cls, directory):
+        '''Records every controller to its own file in the given directory.'''
+
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+
+        for controller in cls.controllers:
+            controller.startRecording(
+                os.path.join(directory, 'controller%d-%s.bin' % (controller.port, stamp))
+            )
+
+    @classmethod
+    def stopRecordingAll(cls):
+        for controller in cls.controllers:
+            controller.stopRecording()
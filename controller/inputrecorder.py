@@ -0,0 +1,79 @@
+'''
+Reads and writes controller sessions as fixed-width binary records, so a real
+driving session can be replayed in the simulator. A file starts with a header
+naming the format and how many axes each record holds. Each record is the loop
+count, the FPGA time, the button mask (DPad bits included), the POV angle and
+every axis as already-inverted floats.
+'''
+
+import struct
+
+MAGIC = b'KCIR'
+VERSION = 1
+
+header = struct.Struct('<4sBB')
+
+
+def recordFormat(axisCount):
+    return struct.Struct('<IdIh%df' % axisCount)
+
+
+class InputRecorder:
+    '''Appends one record per loop to a session file.'''
+
+    def __init__(self, path, axisCount):
+        self.path = path
+        self.record = recordFormat(axisCount)
+
+        self.file = open(path, 'wb')
+        self.file.write(header.pack(MAGIC, VERSION, axisCount))
+
+    def write(self, tick, timestamp, buttons, pov, axes):
+        self.file.write(self.record.pack(tick, timestamp, buttons, pov, *axes))
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+
+class InputReader:
+    '''Loads a session file and steps through its records.'''
+
+    def __init__(self, path):
+        self.path = path
+
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        magic, version, self.axisCount = header.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('%s is not a controller recording' % path)
+
+        body = memoryview(data)[header.size:]
+        record = recordFormat(self.axisCount)
+
+        '''Drop a partial record left by a crash mid-write.'''
+        body = body[:len(body) - len(body) % record.size]
+
+        self.records = list(record.iter_unpack(body))
+        self.index = 0
+
+    def __len__(self):
+        return len(self.records)
+
+    def next(self):
+        '''Returns (tick, timestamp, buttons, pov, axes), or None when done.'''
+
+        if self.index >= len(self.records):
+            return None
+
+        tick, timestamp, buttons, pov, *axes = self.records[self.index]
+        self.index += 1
+
+        return tick, timestamp, buttons, pov, axes
+
+    def isFinished(self):
+        return self.index >= len(self.records)
+
+    def rewind(self):
+        self.index = 0
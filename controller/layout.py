@@ -43,8 +43,13 @@ from commands.revolver.actualrevolvershakecommand import ActualRevolverShakeComm
 from commands.revolver.revolvergobackcommand import RevolverGoBackCommand
 
 from commands.resetcommand import ResetCommand
+from wpilib import RobotBase
+
 from . import logicalaxes
 from .logitechdualshock import LogitechDualShock
+from .replaycontroller import ReplayController
+
+import os
 
 
 def init():
@@ -60,9 +65,9 @@ def init():
 
     # The controller for driving the robot
 
-    driveController = LogitechDualShock(0)
+    driveController = createController(0)
 
-    operatorController = LogitechDualShock(1)
+    operatorController = createController(1)
 
     logicalaxes.driveX = driveController.LeftX
     logicalaxes.driveY = driveController.LeftY
@@ -129,3 +134,16 @@ def init():
     operatorController.LeftBumper.whileHeld(LowerHoodCommand())
     
     #operatorController.X.toggleWhenPressed(BoogityCommand())
+
+
+def createController(port):
+    '''
+    In the simulator, setting REPLAY_CONTROLLER_<port> to a recording replays
+    it in place of that controller.
+    '''
+
+    replay = os.environ.get('REPLAY_CONTROLLER_%d' % port)
+    if replay and RobotBase.isSimulation():
+        return ReplayController(port, replay)
+
+    return LogitechDualShock(port)
@@ -1,6 +1,6 @@
-from wpilib.buttons import Button
+from .controllerbutton import ControllerButton
 
-class POVButton(Button):
+class POVButton(ControllerButton):
     '''
     Turns DPad readings into button presses, so they can be used like any other
     button.
@@ -9,19 +9,8 @@ class POVButton(Button):
     def __init__(self, controller, angle):
         '''
         Pressing up on the DPad returns 0, up/right returns 45, right return 90
-        and so on. So, we can tell if a button is pressed if the reading is
-        within 45 degrees of the passed angle.
+        and so on. The controller turns the reading into DPad button bits when
+        it takes its snapshot, so all we need is our bit.
         '''
 
-        super().__init__()
-
-        self.validAngles = [angle, angle - 45, angle + 45]
-        self.validAngles = [x % 360 for x in self.validAngles]
-
-        self.controller = controller
-
-
-    def get(self):
-        '''Whether the button is pressed or not.'''
-        
-        return self.controller.getPOV() in self.validAngles
+        super().__init__(controller, 20 + (angle % 360) // 90)
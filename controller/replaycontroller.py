@@ -0,0 +1,51 @@
+from .logitechdualshock import LogitechDualShock
+from .inputrecorder import InputReader
+
+class ReplayController(LogitechDualShock):
+    '''
+    Stands in for a LogitechDualShock in simulation, feeding it a recorded
+    session one record per loop instead of reading the DriverStation. Replay
+    follows loops, not the clock, so a sped up simulation replays faster than
+    real time. Sessions are only recorded in teleop, so replay only steps while
+    teleop is enabled; the rest of the time, and once the recording runs out,
+    every input reads as released.
+    '''
+
+    def __init__(self, port, path, loop=False):
+        super().__init__(port)
+
+        self.reader = InputReader(path)
+        self.loop = loop
+
+        if self.reader.axisCount != self.axisCount:
+            raise ValueError(
+                '%s has %d axes, but the controller has %d' % (path, self.reader.axisCount, self.axisCount)
+            )
+
+        '''The recorded time of the current record, for comparing loop timing.'''
+        self.recordedTime = None
+
+    def _read(self):
+        if not (self.ds.isEnabled() and self.ds.isOperatorControl()):
+            self._release()
+            return
+
+        record = self.reader.next()
+
+        if record is None and self.loop:
+            self.reader.rewind()
+            record = self.reader.next()
+
+        if record is None:
+            self._release()
+            return
+
+        tick, self.recordedTime, self.buttons, self.pov, axes = record
+        for id, value in enumerate(axes):
+            self.axes[id] = value
+
+    def _release(self):
+        self.buttons = 0
+        self.pov = -1
+        for id in range(self.axisCount):
+            self.axes[id] = 0.0
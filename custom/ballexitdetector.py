@@ -0,0 +1,76 @@
+'''
+Counts balls leaving the shooter from the flywheel speed. Each ball pulls a
+quick dip out of the flywheel as it goes through, so once the flywheel is up to
+speed, a drop of more than dipThreshold below the target is a ball. The
+detector re-arms when the speed recovers to within recoverThreshold, which
+keeps a single slow dip from counting twice.
+'''
+
+
+class BallExitDetector:
+
+    def __init__(self, dipThreshold=250, recoverThreshold=100, minInterval=0.06):
+        '''
+        dipThreshold: RPM below the target that counts as a ball.
+        recoverThreshold: RPM below the target the flywheel has to get back to
+                          before another ball can count.
+        minInterval: Seconds after a ball where another dip is ignored.
+        '''
+
+        self.dipThreshold = dipThreshold
+        self.recoverThreshold = recoverThreshold
+        self.minInterval = minInterval
+
+        self.reset()
+
+    def reset(self):
+        self.armed = False
+        self.shots = 0
+        self.lastExit = None
+        self.lastInterval = 0.0
+        self.intervals = []
+
+    def update(self, timestamp, rpm, targetRPM):
+        '''Feed one sample. Returns True if a ball just left.'''
+
+        if targetRPM <= 0:
+            self.armed = False
+            return False
+
+        drop = targetRPM - rpm
+
+        if not self.armed:
+            if drop <= self.recoverThreshold:
+                self.armed = True
+
+            return False
+
+        if drop < self.dipThreshold:
+            return False
+
+        if self.lastExit is not None and timestamp - self.lastExit < self.minInterval:
+            return False
+
+        self.armed = False
+
+        if self.lastExit is not None:
+            self.lastInterval = timestamp - self.lastExit
+            self.intervals.append(self.lastInterval)
+
+        self.lastExit = timestamp
+        self.shots += 1 # Last, since other threads take a count above zero to mean lastExit is set.
+
+        return True
+
+    def isRecovered(self):
+        '''True once the speed is back within recoverThreshold, until the next ball.'''
+        return self.armed
+
+    def getShots(self):
+        return self.shots
+
+    def getLastExit(self):
+        return self.lastExit
+
+    def getIntervals(self):
+        return list(self.intervals)
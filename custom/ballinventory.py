@@ -0,0 +1,117 @@
+'''
+Keeps track of which revolver chambers have a ball in them. Nothing polls it
+for an answer; it is fed the sensors once a loop and changes only on events:
+
+    The front colour sensor sees a ball come in: the chamber at the intake
+    is now full.
+
+    The flywheel counts a ball leaving: the chamber at the drop is now empty
+    (or the nearest full one, if we had it wrong).
+
+    The zone sensors say the revolver is empty: every chamber is empty. If
+    they see a ball while we think we have none, and it isn't just the last
+    ball on its way out, we missed one coming in.
+
+Every sensor is debounced, so a ball rattling past the colour sensor only
+counts once.
+'''
+
+
+class Debouncer:
+    '''Only changes once the input has held its new value for count samples.'''
+
+    def __init__(self, count, value=False):
+        self.count = count
+        self.value = value
+        self.pending = 0
+
+    def update(self, value):
+        '''Returns True on the sample the output changes.'''
+
+        if value == self.value:
+            self.pending = 0
+            return False
+
+        self.pending += 1
+        if self.pending < self.count:
+            return False
+
+        self.value = value
+        self.pending = 0
+
+        return True
+
+
+class BallInventory:
+
+    def __init__(self, chambers=5, debounce=3, settle=15):
+        '''
+        chambers: How many balls the revolver holds.
+        debounce: Loops a sensor has to agree with itself before we believe it.
+        settle: Loops after a shot before the zone sensors can add a ball back.
+        '''
+
+        self.chambers = chambers
+        self.settle = settle
+
+        self.front = Debouncer(debounce)
+        self.zone = Debouncer(debounce)
+
+        self.reset()
+
+    def reset(self, occupied=None):
+        self.occupied = list(occupied) if occupied else [False] * self.chambers
+        self.shots = None
+        self.sinceShot = self.settle
+
+    def update(self, frontSeesBall, zoneSeesBall, intakeChamber, dropChamber, shots):
+        '''
+        Feed the sensors for this loop. intakeChamber and dropChamber are the
+        chambers lined up with the intake and the drop, and shots is the
+        shooter's running count of balls that left. Returns True if the count
+        changed.
+        '''
+
+        count = self.getCount()
+
+        if self.front.update(frontSeesBall) and self.front.value:
+            self.occupied[intakeChamber] = True
+
+        self.sinceShot += 1
+
+        if self.shots is not None and shots > self.shots:
+            for i in range(shots - self.shots):
+                self._fire(dropChamber)
+
+            self.sinceShot = 0
+
+        self.shots = shots
+
+        if self.zone.update(zoneSeesBall) and not self.zone.value:
+            self.occupied = [False] * self.chambers
+
+        elif self.zone.value and self.getCount() == 0 and self.sinceShot >= self.settle: # The sensors lag the last ball out.
+            self.occupied[dropChamber] = True
+
+        return self.getCount() != count
+
+    def _fire(self, dropChamber):
+        '''Empties the chamber at the drop, or the nearest full one to it.'''
+
+        for offset in range(self.chambers):
+            for chamber in ((dropChamber + offset) % self.chambers, (dropChamber - offset) % self.chambers):
+                if self.occupied[chamber]:
+                    self.occupied[chamber] = False
+                    return
+
+    def getCount(self):
+        return sum(self.occupied)
+
+    def getChambers(self):
+        return list(self.occupied)
+
+    def isFull(self):
+        return all(self.occupied)
+
+    def isEmpty(self):
+        return not any(self.occupied)
@@ -0,0 +1,65 @@
+'''
+Reads a ColorSensorV3 on its own thread. Every I2C read blocks for a few
+milliseconds (and sometimes a lot longer), which the main loop can't afford.
+The thread reads at the sensor's measurement rate and swaps the newest
+reading in as one tuple, so callers always get a reading and its timestamp
+that belong together, without locking.
+'''
+
+import threading
+
+from wpilib import Timer
+
+
+class ColorSensorPoller:
+
+    def __init__(self, sensor, period=0.1, staleAfter=0.3):
+        '''
+        period: Seconds between reads. Match the sensor's measurement rate;
+                reading faster just returns the same measurement.
+        staleAfter: Seconds without a good read before the reading is stale.
+        '''
+
+        self.sensor = sensor
+        self.period = period
+        self.staleAfter = staleAfter
+
+        self.latest = (0, None) # (proximity, FPGA time it was read).
+        self.errors = 0
+
+        self.running = threading.Event()
+        self.thread = threading.Thread(target=self._run, name='ColorSensorPoller', daemon=True)
+
+    def start(self):
+        self.running.set()
+        self.thread.start()
+
+    def stop(self):
+        self.running.clear()
+
+    def _run(self):
+        while self.running.is_set():
+            start = Timer.getFPGATimestamp()
+
+            try:
+                self.latest = (self.sensor.getProximity(), Timer.getFPGATimestamp())
+            except Exception: # A bad transaction shouldn't end the thread; the reading just goes stale.
+                self.errors += 1
+
+            Timer.delay(max(self.period - (Timer.getFPGATimestamp() - start), 0.005))
+
+    def getProximity(self):
+        return self.latest[0]
+
+    def getLatest(self):
+        '''Returns (proximity, timestamp, stale).'''
+
+        proximity, timestamp = self.latest
+
+        return proximity, timestamp, self._isStale(timestamp)
+
+    def isStale(self):
+        return self._isStale(self.latest[1])
+
+    def _isStale(self, timestamp):
+        return timestamp is None or Timer.getFPGATimestamp() - timestamp > self.staleAfter
@@ -0,0 +1,154 @@
+'''
+One distance to the goal for everything that needs one. The Limelight gives
+us three ways to get it, and each is good at a different range:
+
+    angle:   The target's height in the image, through the camera's pitch.
+             Solid up close, gets touchy far out where tan flattens.
+    area:    How big the target looks. Noisy everywhere, but doesn't care
+             about the camera mount.
+    camtran: The solvePnP Z. Great close, falls apart once the target is
+             only a few pixels tall. All zeros when 3D isn't on.
+
+Each model has a variance (inches squared) for a set of distances, and we
+take the inverse variance weighted mean of the ones that gave an answer. The
+result is cached per frame, so every caller in a loop gets the same number
+and the trig runs once.
+
+The variances are rough to start with. Log frames at taped-off distances
+and refit them with fitVariances().
+'''
+
+import math
+
+import numpy
+
+
+'''
+Variance of each model at the distances in varianceDistances, in inches
+squared. Distances outside the table use the nearest end.
+'''
+varianceDistances = (60, 120, 180, 240, 300, 360)
+
+variances = {
+    'angle': (4, 9, 25, 64, 144, 256),
+    'area': (100, 144, 225, 400, 625, 900),
+    'camtran': (2, 6, 30, 120, 400, 1000),
+}
+
+
+def fitVariances(trueDistances, estimates, distances=varianceDistances, binWidth=60):
+    '''
+    estimates: {model: array of what that model read for each frame}.
+    Returns {model: tuple of variances} at distances, from the frames within
+    binWidth / 2 of each. Bins with fewer than three frames keep the current value.
+    '''
+
+    trueDistances = numpy.asarray(trueDistances, dtype=float)
+    fitted = {}
+
+    for name, values in estimates.items():
+        errors = numpy.asarray(values, dtype=float) - trueDistances
+        row = []
+
+        for i, distance in enumerate(distances):
+            inBin = numpy.abs(trueDistances - distance) <= binWidth / 2
+            inBin &= numpy.isfinite(errors)
+
+            if numpy.count_nonzero(inBin) < 3:
+                row.append(variances[name][i])
+            else:
+                row.append(float(numpy.mean(errors[inBin] ** 2)))
+
+        fitted[name] = tuple(row)
+
+    return fitted
+
+
+class DistanceEstimator:
+
+    def __init__(self, targetHeight=98.25, cameraHeight=20, cameraPitch=30.52289, minDistance=12, maxDistance=720):
+        '''
+        cameraPitch: Degrees the camera is tilted up; calibrated so a level
+                     frame reads the right distance.
+        minDistance and maxDistance: Inches. A model reading outside these
+                                     is ignored for that frame.
+        '''
+
+        self.height = targetHeight - cameraHeight
+        self.cameraPitch = cameraPitch
+        self.minDistance = minDistance
+        self.maxDistance = maxDistance
+
+        self.variances = dict(variances)
+
+        self.frame = None
+        self.distance = 0.0
+        self.variance = math.inf
+        self.estimates = {}
+
+    def angleModel(self, vertical, area, camtran):
+        angle = math.radians(self.cameraPitch + vertical)
+        if angle <= 0:
+            return None
+
+        return self.height / math.tan(angle)
+
+    def areaModel(self, vertical, area, camtran):
+        if area <= 0:
+            return None
+
+        return math.log(area, .992924) + 221.996
+
+    def camtranModel(self, vertical, area, camtran):
+        if len(camtran) < 3 or camtran[2] == 0:
+            return None
+
+        return math.hypot(camtran[0], camtran[2]) # Z is negative toward the goal; x is how far off to the side we are.
+
+    def getVariance(self, name, distance):
+        return float(numpy.interp(distance, varianceDistances, self.variances[name]))
+
+    def estimate(self, vertical, area, camtran, frame):
+        '''
+        Fuses the models for a frame. frame identifies it (the capture
+        timestamp works); asking again for the same frame returns the cached
+        distance.
+        '''
+
+        if frame == self.frame:
+            return self.distance
+
+        self.frame = frame
+        self.estimates = {}
+
+        models = (
+            ('angle', self.angleModel),
+            ('area', self.areaModel),
+            ('camtran', self.camtranModel),
+        )
+
+        weights = 0.0
+        total = 0.0
+
+        for name, model in models:
+            distance = model(vertical, area, camtran)
+
+            if distance is None or not self.minDistance <= distance <= self.maxDistance:
+                continue
+
+            self.estimates[name] = distance
+
+            weight = 1 / self.getVariance(name, distance)
+            weights += weight
+            total += weight * distance
+
+        if weights > 0:
+            self.distance = total / weights
+            self.variance = 1 / weights
+        else:
+            self.variance = math.inf # Keep the last distance, but say we don't trust it.
+
+        return self.distance
+
+    def getStandardDeviation(self):
+        return math.sqrt(self.variance)
@@ -27,6 +27,8 @@ def init():
     from commands.autonomouscommandgroup import AutonomousCommandGroup
     from commands.drivetrain.resettiltcommand import ResetTiltCommand
     from commands.tools.configurepidcommandgroup import ConfigurePIDCommandGroup
+    from commands.hood.calibratehoodlashcommand import CalibrateHoodLashCommand
+    from commands.turret.setturretstraightaheadcommand import SetTurretStraightAheadCommand
 
 
     '''
@@ -41,6 +43,8 @@ def init():
 
     #showCommand(ResetTiltCommand())
     #showCommand(ConfigurePIDCommandGroup())
+    showCommand(CalibrateHoodLashCommand())
+    showCommand(SetTurretStraightAheadCommand())
 
 
 def getAutonomousProgram():
@@ -0,0 +1,146 @@
+'''
+A first order model of a flywheel: volts = kS + kV * rpm + kA * rpm/s. It gives
+the feedforward for a target speed and predicts how long the flywheel takes to
+get there. Fit the constants from a logged step response with fit(), or run
+this file on a CSV of time, volts, rpm rows:
+
+    python3 custom/flywheelmodel.py shooterstep.csv
+'''
+
+import math
+import sys
+import numpy
+
+'''Falcon 500 motor constants, for turning kA into a moment of inertia.'''
+falconStallTorque = 4.69 # Nm
+falconStallCurrent = 257 # A
+falconResistance = 12 / falconStallCurrent # Ohms
+
+
+class FlywheelModel:
+
+    def __init__(self, kS, kV, kA):
+        '''
+        kS: Volts to overcome friction.
+        kV: Volts per RPM.
+        kA: Volts per RPM per second.
+        '''
+
+        self.kS = kS
+        self.kV = kV
+        self.kA = kA
+
+    def calculate(self, rpm, acceleration=0):
+        '''Volts needed to hold the speed, or accelerate at the given RPM/s.'''
+
+        friction = math.copysign(self.kS, rpm) if rpm else 0
+
+        return friction + self.kV * rpm + self.kA * acceleration
+
+    def getTimeConstant(self):
+        '''Seconds to cover about 63% of a step change.'''
+
+        return self.kA / self.kV
+
+    def maxRPM(self, volts):
+        return max(volts - self.kS, 0) / self.kV
+
+    def timeToReach(self, currentRPM, targetRPM, volts):
+        '''
+        Predicts the seconds to go from one speed to another when the motor
+        pushes with the given volts (braking with the same volts when the
+        target is lower). Returns infinity if we can't get there.
+        '''
+
+        if currentRPM == targetRPM:
+            return 0.0
+
+        if targetRPM > currentRPM:
+            limit = self.maxRPM(volts)
+        else:
+            limit = -(volts + self.kS) / self.kV
+
+        '''Exponential approach toward the speed that the volts can hold.'''
+        remaining = (limit - targetRPM) / (limit - currentRPM)
+        if remaining <= 0:
+            return math.inf
+
+        return -self.getTimeConstant() * math.log(remaining)
+
+    def closedLoopTimeToReach(self, currentRPM, targetRPM, tolerance, volts, kP):
+        '''
+        Predicts the seconds until a velocity loop holding targetRPM, with
+        this model as its feedforward and kP volts per RPM of error, gets
+        within tolerance from below. The loop only pushes the full volts while
+        the error is big; after that the output shrinks with the error, so the
+        last stretch is an exponential with a shorter time constant, not a
+        flat out run. A target the volts can't hold is treated as the speed
+        they can.
+        '''
+
+        targetRPM = min(targetRPM, self.maxRPM(volts))
+        error = targetRPM - currentRPM
+
+        if error <= tolerance:
+            return 0.0
+
+        saturatedError = (volts - self.calculate(targetRPM)) / kP # Error below which the loop stops saturating.
+
+        if saturatedError <= tolerance:
+            return self.timeToReach(currentRPM, targetRPM - tolerance, volts)
+
+        time = 0.0
+        if error > saturatedError:
+            time = self.timeToReach(currentRPM, targetRPM - saturatedError, volts)
+            error = saturatedError
+
+        return time + self.kA / (self.kV + kP) * math.log(error / tolerance)
+
+    def inertia(self, motors=2, gearing=1):
+        '''
+        Moment of inertia of the flywheel in kg*m^2, from kA and the Falcon's
+        motor constants. Gearing is motor turns per flywheel turn.
+        '''
+
+        kARadians = self.kA * 60 / (2 * math.pi) # Volts per rad/s^2
+        torquePerAmp = falconStallTorque / falconStallCurrent
+
+        return kARadians * motors * torquePerAmp * gearing / falconResistance
+
+    @classmethod
+    def fit(cls, times, volts, rpms):
+        '''
+        Least squares fit of kS, kV and kA from a logged step response. The
+        log needs at least two different voltages (a step up from one level
+        to another works), otherwise kS alone explains a single flat voltage.
+        Samples with the motor stopped are ignored because friction is unknown
+        there.
+        '''
+
+        times = numpy.asarray(times, dtype=float)
+        volts = numpy.asarray(volts, dtype=float)
+        rpms = numpy.asarray(rpms, dtype=float)
+
+        accelerations = numpy.gradient(rpms, times)
+
+        moving = rpms != 0
+        terms = numpy.column_stack((
+            numpy.sign(rpms[moving]),
+            rpms[moving],
+            accelerations[moving]
+        ))
+
+        (kS, kV, kA), *_ = numpy.linalg.lstsq(terms, volts[moving], rcond=None)
+
+        return cls(float(kS), float(kV), float(kA))
+
+
+if __name__ == '__main__':
+    data = numpy.loadtxt(sys.argv[1], delimiter=',', comments='#', ndmin=2)
+    model = FlywheelModel.fit(data[:, 0], data[:, 1], data[:, 2])
+
+    print('kS = %.5f V' % model.kS)
+    print('kV = %.7f V/RPM' % model.kV)
+    print('kA = %.7f V/(RPM/s)' % model.kA)
+    print('Time constant = %.3f s' % model.getTimeConstant())
+    print('Inertia = %.6f kg*m^2' % model.inertia())
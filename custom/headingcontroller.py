@@ -0,0 +1,76 @@
+from wpilib.controller import ProfiledPIDController
+from wpilib.trajectory import TrapezoidProfile
+
+import math
+
+
+class HeadingController:
+    '''
+    Holds the drive base on a gyro heading. A profiled PID moves the setpoint
+    toward the target at a limited turn rate, the profile's velocity is fed
+    forward, and the gyro's yaw rate damps the turn so we don't oscillate when
+    driving hard. The output is a rotate value for drivetrain.move().
+
+    Angles are continuous gyro readings (see getContinuousAngle), so crossing
+    zero never sends the robot the long way around.
+    '''
+
+    def __init__(self, p=0.01, i=0, d=0, maxRate=270, maxAcceleration=540, kV=0.0015, kRate=0.001, tolerance=1.5, maxOutput=0.5, minOutput=0):
+        '''
+        maxRate and maxAcceleration are in degrees per second (squared). kV is
+        rotate output per degree per second of profiled turn rate. kRate is the
+        rotate output per degree per second that we turn faster than the
+        profile wants. minOutput is added to any correction so it survives the
+        drive base's deadband.
+        '''
+
+        self.controller = ProfiledPIDController(
+            p, i, d,
+            TrapezoidProfile.Constraints(maxRate, maxAcceleration)
+        )
+
+        self.kV = kV
+        self.kRate = kRate
+        self.tolerance = tolerance
+        self.maxOutput = maxOutput
+        self.minOutput = minOutput
+
+        self.target = 0
+        self.error = 0
+
+    def setTarget(self, heading):
+        '''Any heading works, it will be treated as the closest equivalent angle.'''
+
+        self.target = heading % 360
+
+    def getTarget(self):
+        return self.target
+
+    def reset(self, angle, rate=0):
+        '''Start the profile from where we are, so engaging doesn't jerk the robot.'''
+
+        self.controller.reset(TrapezoidProfile.State(angle, rate))
+
+    def calculate(self, angle, rate):
+        '''
+        Takes the continuous gyro angle and yaw rate, both read once by the
+        caller, and returns the rotate value.
+        '''
+
+        self.error = (self.target - angle + 180) % 360 - 180
+        goal = angle + self.error
+
+        output = self.controller.calculate(angle, goal)
+
+        setpointRate = self.controller.getSetpoint().velocity
+        output += self.kV * setpointRate + self.kRate * (setpointRate - rate)
+
+        if self.atTarget() and abs(setpointRate) < 1:
+            return 0
+
+        output = math.copysign(abs(output) + self.minOutput, output)
+
+        return max(min(output, self.maxOutput), -self.maxOutput)
+
+    def atTarget(self):
+        return abs(self.error) <= self.tolerance
@@ -0,0 +1,143 @@
+'''
+Turns (x, y, rotate) drive inputs into wheel speeds. The per-tick functions
+write into a list the drive base owns, so moving doesn't build new lists every
+loop. The batch functions take NumPy arrays of inputs and are meant for
+simulation and tuning sweeps off the robot.
+
+Speeds follow the drive base convention: the right side runs reversed.
+'''
+
+import math
+import numpy
+
+
+def skidSpeeds(x, y, rotate, out):
+    '''Fills out with [left, right] speeds. Skid drives can't strafe, so x is ignored.'''
+
+    out[0] = y + rotate
+    out[1] = -y + rotate
+
+    return out
+
+
+def mecanumSpeeds(x, y, rotate, out):
+    '''Fills out with [frontLeft, frontRight, rearLeft, rearRight] speeds.'''
+
+    out[0] = x + y + rotate
+    out[1] = x - y + rotate
+    out[2] = -x + y + rotate
+    out[3] = -x - y + rotate
+
+    return out
+
+
+def normalize(speeds):
+    '''Scales the speeds in place so that none of them is above 1.'''
+
+    maxSpeed = 0
+    for speed in speeds:
+        if speed > maxSpeed:
+            maxSpeed = speed
+        elif -speed > maxSpeed:
+            maxSpeed = -speed
+
+    if maxSpeed > 1:
+        for i in range(len(speeds)):
+            speeds[i] /= maxSpeed
+
+    return speeds
+
+
+class FieldOrientation:
+    '''
+    Rotates joystick inputs by the gyro heading so the robot drives the way the
+    stick points. The sine and cosine are only recomputed when the heading
+    changes.
+    '''
+
+    def __init__(self):
+        self.heading = None
+        self.cos = 1.0
+        self.sin = 0.0
+
+    def update(self, heading):
+        '''Heading is in degrees.'''
+
+        if heading != self.heading:
+            radians = math.radians(heading)
+
+            self.cos = math.cos(radians)
+            self.sin = math.sin(radians)
+            self.heading = heading
+
+    def rotate(self, x, y, heading):
+        self.update(heading)
+
+        return x * self.cos - y * self.sin, x * self.sin + y * self.cos
+
+
+def applyDeadbandBatch(values, deadband):
+    '''Same as the deadband in move(), for an array of values.'''
+
+    return numpy.copysign(numpy.maximum(numpy.abs(values) - deadband, 0), values)
+
+
+def normalizeBatch(speeds):
+    '''Scales each row in place so that none of its speeds is above 1.'''
+
+    maxSpeeds = numpy.abs(speeds).max(axis=1, keepdims=True)
+    numpy.divide(speeds, maxSpeeds, out=speeds, where=maxSpeeds > 1)
+
+    return speeds
+
+
+def _splitInputs(inputs, deadband):
+    inputs = numpy.asarray(inputs, dtype=float)
+
+    if inputs.ndim != 2 or inputs.shape[1] != 3:
+        raise ValueError('Inputs must be an array of (x, y, rotate) rows')
+
+    if deadband:
+        inputs = applyDeadbandBatch(inputs, deadband)
+
+    return inputs[:, 0], inputs[:, 1], inputs[:, 2]
+
+
+def skidSpeedsBatch(inputs, deadband=0):
+    '''
+    Takes an (N, 3) array of (x, y, rotate) and returns an (N, 2) array of
+    normalized [left, right] speeds.
+    '''
+
+    x, y, rotate = _splitInputs(inputs, deadband)
+
+    speeds = numpy.empty((len(y), 2))
+    numpy.add(y, rotate, out=speeds[:, 0])
+    numpy.subtract(rotate, y, out=speeds[:, 1])
+
+    return normalizeBatch(speeds)
+
+
+def mecanumSpeedsBatch(inputs, headings=None, deadband=0):
+    '''
+    Takes an (N, 3) array of (x, y, rotate) and returns an (N, 4) array of
+    normalized [frontLeft, frontRight, rearLeft, rearRight] speeds. Pass an
+    array of gyro headings in degrees to drive field oriented.
+    '''
+
+    x, y, rotate = _splitInputs(inputs, deadband)
+
+    if headings is not None:
+        radians = numpy.radians(numpy.asarray(headings, dtype=float))
+        cosA = numpy.cos(radians)
+        sinA = numpy.sin(radians)
+
+        x, y = x * cosA - y * sinA, x * sinA + y * cosA
+
+    speeds = numpy.empty((len(x), 4))
+    speeds[:, 0] = x + y + rotate
+    speeds[:, 1] = x - y + rotate
+    speeds[:, 2] = -x + y + rotate
+    speeds[:, 3] = -x - y + rotate
+
+    return normalizeBatch(speeds)
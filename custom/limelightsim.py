@@ -0,0 +1,159 @@
+'''
+A stand-in Limelight for the simulator. It works out what the camera would
+see from the robot's pose, the turret angle and where the goal is, then
+publishes frames to the limelight table the way the real camera does: at its
+frame rate, a latency late, with some noise, and only while a targeting
+pipeline is selected. The vision commands run against it unchanged.
+
+The camera is mounted on its side, so the horizontal offset to the goal is
+published as ty and the vertical one as tx, same as the real one.
+'''
+
+from collections import deque
+
+from networktables import NetworkTables
+from wpilib import Notifier, Timer
+
+import fieldconstants
+import math
+import random
+
+
+class LimelightSim:
+
+    def __init__(self, frameRate=90, latency=0.025, angleNoise=0.1, areaNoise=0.03, outlierRate=0.0,
+                 targetPipelines=(0,), switchFrames=3, poseSource=None, turretSource=None, seed=0):
+        '''
+        latency: Seconds from capture to the frame showing up; tl reports it in ms.
+        angleNoise: Standard deviation of tx and ty, in degrees.
+        areaNoise: Standard deviation of ta, as a fraction of it.
+        outlierRate: Chance a frame is a reflection somewhere else entirely.
+        switchFrames: Frames with no target after the pipeline changes.
+        poseSource: Returns (x, y, heading) in inches and degrees. By default,
+                    the drive base odometry.
+        turretSource: Returns the turret's angle from the front of the robot.
+        seed: Seeds the noise, so a run can be repeated. None for a different
+              run every time.
+        '''
+
+        self.table = NetworkTables.getTable('limelight')
+
+        self.frameRate = frameRate
+        self.latency = latency
+        self.angleNoise = angleNoise
+        self.areaNoise = areaNoise
+        self.outlierRate = outlierRate
+        self.targetPipelines = targetPipelines
+        self.switchFrames = switchFrames
+
+        self.poseSource = poseSource or self._odometryPose
+        self.turretSource = turretSource or self._turretAngle
+
+        '''Mounting, matched to Limelight.calcDistance so it reads the true distance back.'''
+        self.cameraHeight = 20
+        self.cameraPitch = 30.52289
+        self.horizontalFOV = 59.6
+        self.verticalFOV = 49.7
+
+        self.pipeline = 0
+        self.blindFrames = 0
+        self.pending = deque()
+
+        self.random = random.Random(seed)
+
+        self.notifier = Notifier(self._tick)
+
+    def start(self):
+        self.notifier.startPeriodic(1 / self.frameRate)
+
+    def stop(self):
+        self.notifier.stop()
+
+    def _odometryPose(self):
+        import robot
+
+        pose = robot.drivetrain.getPoseMeters()
+        return (
+            pose.translation().X() * 39.37,
+            pose.translation().Y() * 39.37,
+            pose.rotation().getDegrees()
+        )
+
+    def _turretAngle(self):
+        import robot
+
+        return robot.turret.getRobotAngle()
+
+    def frameAt(self, x, y, heading, turretAngle):
+        '''
+        The perfect frame for the robot at (x, y) inches facing heading, with
+        the turret at turretAngle. Returns a dict of limelight entries.
+        '''
+
+        dx = fieldconstants.Goal.x * 39.37 - x
+        dy = fieldconstants.Goal.y * 39.37 - y
+        distance = math.hypot(dx, dy)
+
+        horizontal = math.degrees(math.atan2(dy, dx)) - heading - turretAngle
+        horizontal = (horizontal + 180) % 360 - 180
+
+        vertical = math.degrees(math.atan2(fieldconstants.Goal.height - self.cameraHeight, distance)) - self.cameraPitch
+
+        if abs(horizontal) > self.horizontalFOV / 2 or abs(vertical) > self.verticalFOV / 2 or distance == 0:
+            return {'tv': 0, 'tx': 0, 'ty': 0, 'ta': 0, 'ts': 0, 'camtran': [0] * 6}
+
+        return {
+            'tv': 1,
+            'tx': vertical,
+            'ty': horizontal,
+            'ta': 0.992924 ** (distance - 221.996), # Inverse of Limelight.areaDistance.
+            'ts': 0,
+            'camtran': [
+                distance * math.sin(math.radians(horizontal)),
+                fieldconstants.Goal.height - self.cameraHeight,
+                -distance * math.cos(math.radians(horizontal)),
+                0,
+                horizontal,
+                0
+            ]
+        }
+
+    def _capture(self):
+        if self.blindFrames > 0 or self.pipeline not in self.targetPipelines:
+            self.blindFrames = max(self.blindFrames - 1, 0)
+            return {'tv': 0, 'tx': 0, 'ty': 0, 'ta': 0, 'ts': 0, 'camtran': [0] * 6}
+
+        x, y, heading = self.poseSource()
+        frame = self.frameAt(x, y, heading, self.turretSource())
+
+        if frame['tv']:
+            if self.random.random() < self.outlierRate:
+                frame['ty'] += self.random.uniform(-15, 15)
+                frame['ta'] *= self.random.uniform(0.2, 3)
+
+            frame['tx'] += self.random.gauss(0, self.angleNoise)
+            frame['ty'] += self.random.gauss(0, self.angleNoise)
+            frame['ta'] *= 1 + self.random.gauss(0, self.areaNoise)
+            frame['ts'] = self.random.gauss(0, 1)
+
+        return frame
+
+    def _tick(self):
+        now = Timer.getFPGATimestamp()
+
+        pipeline = int(self.table.getNumber('pipeline', self.pipeline))
+        if pipeline != self.pipeline:
+            self.pipeline = pipeline
+            self.blindFrames = self.switchFrames
+
+        self.pending.append((now + self.latency, self._capture(), self.pipeline))
+
+        while self.pending and self.pending[0][0] <= now:
+            due, frame, pipeline = self.pending.popleft()
+
+            for key in ('tv', 'tx', 'ty', 'ta', 'ts'):
+                self.table.putNumber(key, frame[key])
+
+            self.table.putNumberArray('camtran', frame['camtran'])
+            self.table.putNumber('tl', self.latency * 1000)
+            self.table.putNumber('getpipe', pipeline)
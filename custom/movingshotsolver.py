@@ -0,0 +1,67 @@
+'''
+Works out where to aim when shooting while driving. The ball leaves with the
+robot's velocity on top of the shot, so over its time of flight it drifts by
+velocity * time. Aiming at a virtual goal shifted back by that much cancels the
+drift. The time of flight depends on the distance to the virtual goal, so the
+two are solved together, a few rounds at most.
+
+Everything is robot relative: x forward, y right, bearings in degrees,
+clockwise positive like the gyro. Distances are inches.
+'''
+
+import math
+
+
+class MovingShotSolver:
+
+    def __init__(self, shotMap, maxIterations=4, tolerance=0.5):
+        '''
+        maxIterations: Bound on rounds per solve, so a tick never runs long.
+        tolerance: Inches the virtual distance can change by and count as solved.
+        '''
+
+        self.shotMap = shotMap
+        self.maxIterations = maxIterations
+        self.tolerance = tolerance
+
+        self.distance = 0.0
+        self.lead = 0.0
+        self.rpm = 0.0
+        self.hoodAngle = 0.0
+        self.timeOfFlight = 0.0
+
+    def solve(self, distance, bearing, vx, vy=0.0):
+        '''
+        distance and bearing: Where the goal is now.
+        vx and vy: Robot velocity in inches per second.
+
+        Returns (rpm, hoodAngle, lead). Lead is the degrees to add to the
+        bearing we aim the turret at.
+        '''
+
+        radians = math.radians(bearing)
+        goalX = distance * math.cos(radians)
+        goalY = distance * math.sin(radians)
+
+        virtualX, virtualY = goalX, goalY
+        virtualDistance = distance
+        timeOfFlight = 0.0
+
+        for i in range(self.maxIterations):
+            timeOfFlight = self.shotMap.getTimeOfFlight(virtualDistance)
+
+            virtualX = goalX - vx * timeOfFlight
+            virtualY = goalY - vy * timeOfFlight
+
+            previous = virtualDistance
+            virtualDistance = math.hypot(virtualX, virtualY)
+
+            if abs(virtualDistance - previous) <= self.tolerance:
+                break
+
+        self.rpm, self.hoodAngle, self.timeOfFlight = self.shotMap.lookupAll(virtualDistance)
+        self.distance = virtualDistance
+        self.lead = math.degrees(math.atan2(virtualY, virtualX)) - bearing
+        self.lead = (self.lead + 180) % 360 - 180
+
+        return self.rpm, self.hoodAngle, self.lead
@@ -0,0 +1,188 @@
+'''
+Keeps a record of every shot so the shot map can be refit from what the robot
+actually did. Each shot is one fixed-width binary record appended to a log on
+the RIO; the file is only ever appended to, so a brown out costs at most the
+shot being written.
+
+Run this file on one or more logs to turn them into datasets:
+
+    python3 custom/shotlogger.py shots.bin --csv shots.csv
+    python3 custom/shotlogger.py shots.bin --shots 3,4,9 --shotmap newmap.csv
+
+--shots keeps only the listed shot numbers (the ones that went in), and
+--shotmap bins them by distance into rows ShotMap can load.
+'''
+
+import os
+import struct
+import sys
+import numpy
+
+MAGIC = b'KSHL'
+VERSION = 1
+
+header = struct.Struct('<4sB')
+
+'''Field names and formats, in the order they are packed.'''
+fields = (
+    ('timestamp', 'd'),
+    ('shot', 'I'),
+    ('tv', 'f'),
+    ('tx', 'f'),
+    ('ty', 'f'),
+    ('ta', 'f'),
+    ('tl', 'f'),
+    ('distance', 'f'),
+    ('targetRPM', 'f'),
+    ('rpm', 'f'),
+    ('hoodPosition', 'f'),
+    ('launchAngle', 'f'),
+    ('turretPosition', 'f'),
+    ('pressure', 'f'),
+    ('battery', 'f'),
+)
+
+record = struct.Struct('<' + ''.join(f for _, f in fields))
+
+'''The same layout as record, for loading a whole log at once.'''
+dtype = numpy.dtype([(name, '<' + f) for name, f in fields])
+
+
+class ShotLogger:
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+        self.shots = 0
+
+    def open(self):
+        '''Opens the log lazily, so a missing directory never stops the robot.'''
+
+        if self.file is not None:
+            return True
+
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            self.file = open(self.path, 'ab')
+
+            if self.file.tell() == 0:
+                self.file.write(header.pack(MAGIC, VERSION))
+            else:
+                self.shots = (os.path.getsize(self.path) - header.size) // record.size
+
+        except OSError:
+            self.file = None
+            return False
+
+        return True
+
+    def log(self, **values):
+        '''Appends a shot. Any field not given is written as zero.'''
+
+        if not self.open():
+            return
+
+        self.shots += 1
+        values['shot'] = self.shots
+
+        self.file.write(record.pack(*[values.get(name, 0) for name, _ in fields]))
+        self.file.flush()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+def load(path):
+    '''Returns every shot in a log as a NumPy structured array.'''
+
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    magic, version = header.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('%s is not a shot log' % path)
+
+    '''Drop a partial record left by a crash mid-write.'''
+    count = (len(data) - header.size) // record.size
+
+    return numpy.frombuffer(data, dtype=dtype, count=count, offset=header.size)
+
+
+def loadAll(paths):
+    return numpy.concatenate([load(path) for path in paths])
+
+
+def selectShots(shots, numbers):
+    return shots[numpy.isin(shots['shot'], numbers)]
+
+
+def fitShotMap(shots, binWidth=25):
+    '''
+    Groups shots into distance bins and takes the median RPM and launch angle
+    of each, which is what a shot map row is. Returns an (N, 3) array of
+    distance, rpm, hoodAngle.
+    '''
+
+    shots = shots[shots['tv'] == 1]
+    if len(shots) == 0:
+        raise ValueError('No shots with a target in view')
+
+    bins = numpy.round(shots['distance'] / binWidth).astype(int)
+
+    rows = []
+    for b in numpy.unique(bins):
+        inBin = shots[bins == b]
+        rows.append((
+            numpy.median(inBin['distance']),
+            numpy.median(inBin['rpm']),
+            numpy.median(inBin['launchAngle'])
+        ))
+
+    return numpy.array(rows)
+
+
+def _option(name):
+    if name in sys.argv:
+        i = sys.argv.index(name)
+        value = sys.argv[i + 1]
+        del sys.argv[i:i + 2]
+        return value
+
+    return None
+
+
+if __name__ == '__main__':
+    csvPath = _option('--csv')
+    mapPath = _option('--shotmap')
+    keep = _option('--shots')
+    binWidth = float(_option('--bin') or 25)
+
+    shots = loadAll(sys.argv[1:])
+
+    if keep:
+        shots = selectShots(shots, [int(x) for x in keep.split(',')])
+
+    print('%d shots' % len(shots))
+
+    if csvPath:
+        numpy.savetxt(
+            csvPath,
+            numpy.column_stack([shots[name].astype(float) for name, _ in fields]),
+            delimiter=',',
+            fmt='%g',
+            header=','.join(name for name, _ in fields)
+        )
+
+    if mapPath:
+        numpy.savetxt(
+            mapPath,
+            fitShotMap(shots, binWidth),
+            delimiter=',',
+            fmt='%g',
+            header='Shot map: distance to the goal (inches), shooter RPM, hood launch angle (degrees). ShotMap estimates time of flight.'
+        )
@@ -0,0 +1,155 @@
+'''
+The shot map says what RPM and hood launch angle to use for a given distance to
+the goal, and how long the ball takes to get there. It is a table of measured
+shots, sorted by distance, and values in between are interpolated. The shooter
+and hood both read from it, so tuning one table tunes both.
+'''
+
+from networktables import NetworkTables
+
+import bisect
+import math
+import os
+import numpy
+
+defaultPath = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'shotmap.csv')
+
+columns = ('distance', 'rpm', 'hoodAngle', 'timeOfFlight')
+
+header = 'Shot map: distance to the goal (inches), shooter RPM, hood launch angle (degrees), time of flight (seconds).'
+
+'''For guessing time of flight when a map doesn't have it.'''
+wheelDiameter = 4 # Inches.
+exitEfficiency = 0.45 # Fraction of the flywheel surface speed the ball leaves with.
+
+
+def estimateTimeOfFlight(distance, rpm, hoodAngle):
+    '''A rough guess from the flywheel speed, ignoring drag. Measure it if you can.'''
+
+    exitSpeed = rpm / 60 * math.pi * wheelDiameter * exitEfficiency # Inches per second.
+
+    return distance / (exitSpeed * math.cos(math.radians(hoodAngle)))
+
+
+class ShotMap:
+
+    def __init__(self, path=defaultPath, table='ShotMap'):
+        self.path = path
+
+        self.load(path)
+
+        '''
+        The table is published to NetworkTables. Editing the arrays on the
+        dashboard changes the map live, and setting save writes it to disk.
+        '''
+        self.table = NetworkTables.getTable(table)
+        self.publish()
+        self.table.putBoolean('save', False)
+        self.table.addEntryListener(self._onEdit, localNotify=False)
+
+    def load(self, path):
+        '''Maps without a time of flight column get one estimated.'''
+
+        rows = numpy.loadtxt(path, delimiter=',', comments='#', ndmin=2)
+        self.setTable(*[rows[:, i] for i in range(min(rows.shape[1], len(columns)))])
+
+    def save(self, path=None):
+        numpy.savetxt(
+            path or self.path,
+            self.getTable(),
+            delimiter=',',
+            fmt='%g',
+            header=header
+        )
+
+    def setTable(self, distances, rpms, hoodAngles, timesOfFlight=None):
+        '''Replaces the whole table. Rows don't need to be sorted.'''
+
+        distances = numpy.asarray(distances, dtype=float)
+        rpms = numpy.asarray(rpms, dtype=float)
+        hoodAngles = numpy.asarray(hoodAngles, dtype=float)
+
+        if timesOfFlight is None:
+            timesOfFlight = [estimateTimeOfFlight(*row) for row in zip(distances, rpms, hoodAngles)]
+
+        timesOfFlight = numpy.asarray(timesOfFlight, dtype=float)
+
+        if not len(distances) == len(rpms) == len(hoodAngles) == len(timesOfFlight) or len(distances) == 0:
+            raise ValueError('Every shot map column needs the same, non-zero number of rows')
+
+        order = numpy.argsort(distances, kind='stable')
+
+        self.distances = distances[order]
+        self.rpms = rpms[order]
+        self.hoodAngles = hoodAngles[order]
+        self.timesOfFlight = timesOfFlight[order]
+
+        '''
+        Lookups happen every loop on single values, where plain lists and
+        bisect beat NumPy. Swapping in one tuple keeps a lookup from seeing
+        half of an edit made from the NetworkTables thread.
+        '''
+        self.lists = (
+            self.distances.tolist(),
+            self.rpms.tolist(),
+            self.hoodAngles.tolist(),
+            self.timesOfFlight.tolist()
+        )
+
+    def getTable(self):
+        '''An (N, 4) array of distance, RPM, hood angle and time of flight rows.'''
+
+        return numpy.column_stack((self.distances, self.rpms, self.hoodAngles, self.timesOfFlight))
+
+    def lookupAll(self, distance):
+        '''Returns (rpm, hoodAngle, timeOfFlight) for the distance, held at the ends of the table.'''
+
+        distances, *values = self.lists
+
+        index = bisect.bisect_right(distances, distance)
+
+        if index == 0:
+            return tuple(column[0] for column in values)
+
+        if index == len(distances):
+            return tuple(column[-1] for column in values)
+
+        low = index - 1
+        fraction = (distance - distances[low]) / (distances[index] - distances[low])
+
+        return tuple(column[low] + (column[index] - column[low]) * fraction for column in values)
+
+    def lookup(self, distance):
+        '''Returns (rpm, hoodAngle) for the distance.'''
+
+        return self.lookupAll(distance)[:2]
+
+    def getRPM(self, distance):
+        return self.lookupAll(distance)[0]
+
+    def getHoodAngle(self, distance):
+        return self.lookupAll(distance)[1]
+
+    def getTimeOfFlight(self, distance):
+        return self.lookupAll(distance)[2]
+
+    def publish(self):
+        for column, values in zip(columns, self.lists):
+            self.table.putNumberArray(column, values)
+
+    def _onEdit(self, table, key, value, isNew):
+        if key == 'save':
+            if value:
+                self.save()
+                table.putBoolean('save', False)
+
+            return
+
+        if key not in columns:
+            return
+
+        '''Wait until every column has the same number of rows.'''
+        try:
+            self.setTable(*[table.getNumberArray(column, []) for column in columns])
+        except ValueError:
+            pass
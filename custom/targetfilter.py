@@ -0,0 +1,110 @@
+'''
+Smooths Limelight frames before anything aims with them. The last few frames
+are kept in a ring buffer, and what we report is the median of the ones that
+were accepted. A frame is thrown out if its area or skew doesn't match the
+recent frames, which is what a reflection or a light off the driver station
+looks like. If frames keep getting thrown out, the target really did move, so
+the buffer starts over from the new frames.
+'''
+
+from collections import deque
+
+import numpy
+
+
+def _wrapSkew(skew):
+    '''The Limelight reports skew from -90 to 0; -89 and -1 are nearly the same box.'''
+    return (skew + 45) % 90 - 45
+
+
+class TargetFilter:
+
+    def __init__(self, size=5, areaTolerance=0.35, skewTolerance=15, angleTolerance=6, maxRejects=3, maxAge=5):
+        '''
+        size: Frames kept in the ring buffer.
+        areaTolerance: Fraction the area can differ from the median and still count.
+        skewTolerance: Degrees the skew can differ from the median.
+        angleTolerance: Degrees tx or ty can jump from the median.
+        maxRejects: Frames in a row we throw out before believing them.
+        maxAge: Frames since the last good one before we say we lost the target.
+        '''
+
+        self.size = size
+        self.areaTolerance = areaTolerance
+        self.skewTolerance = skewTolerance
+        self.angleTolerance = angleTolerance
+        self.maxRejects = maxRejects
+        self.maxAge = maxAge
+
+        self.frames = deque(maxlen=size) # Accepted (tx, ty, ta, ts, timestamp).
+        self.history = deque(maxlen=size) # Whether each of the last frames was accepted.
+
+        self.reset()
+
+    def reset(self):
+        self.frames.clear()
+        self.history.clear()
+
+        self.rejects = 0
+        self.age = self.maxAge + 1
+
+        self.tx = 0.0
+        self.ty = 0.0
+        self.ta = 0.0
+        self.ts = 0.0
+        self.timestamp = 0.0
+
+    def update(self, tv, tx, ty, ta, ts, timestamp):
+        '''Feed the newest frame, stamped with when it was captured. Returns True if it was accepted.'''
+
+        accepted = bool(tv) and self._consistent(tx, ty, ta, _wrapSkew(ts))
+
+        if tv and not accepted:
+            self.rejects += 1
+
+            if self.rejects >= self.maxRejects:
+                self.frames.clear()
+                accepted = True
+
+        if accepted:
+            self.rejects = 0
+            self.age = 0
+            self.frames.append((tx, ty, ta, _wrapSkew(ts), timestamp))
+            self._filter()
+        else:
+            self.age += 1
+
+            if self.age > self.maxAge: # Lost it, so whatever we see next is judged on its own.
+                self.frames.clear()
+                self.rejects = 0
+
+        self.history.append(accepted)
+
+        return accepted
+
+    def _consistent(self, tx, ty, ta, ts):
+        if len(self.frames) < 3: # Not enough to judge, so trust it.
+            return True
+
+        if abs(ta - self.ta) > self.areaTolerance * self.ta:
+            return False
+
+        if abs(ts - self.ts) > self.skewTolerance:
+            return False
+
+        return abs(tx - self.tx) <= self.angleTolerance and abs(ty - self.ty) <= self.angleTolerance
+
+    def _filter(self):
+        '''The median is as old as the frames it came from, so take the median time too.'''
+        self.tx, self.ty, self.ta, self.ts, self.timestamp = numpy.median(numpy.array(self.frames), axis=0)
+
+    def hasTarget(self):
+        return self.age <= self.maxAge and len(self.frames) > 0
+
+    def getConfidence(self):
+        '''0 to 1: how many of the last frames were good.'''
+
+        if not self.history:
+            return 0.0
+
+        return sum(self.history) / self.size
@@ -0,0 +1,25 @@
+'''
+Where things are on the field, in the odometry frame: meters from where the
+robot was when odometry was last reset, x forward, y right, headings clockwise
+like the gyro. Auto routines that start somewhere else should move the goal to
+match.
+'''
+
+class Constant:
+    pass
+
+Goal = Constant()
+
+Goal.x = 3.048 # Straight ahead of the starting line, ten feet out.
+Goal.y = 0.0
+Goal.height = 98.25 # Inches, to the middle of the vision target.
+
+'''
+Where we shoot from, as inches from the goal: the initiation line out to
+the front of the trench. PreSpinCommand has the flywheel at speed by the
+time we get here.
+'''
+ShootingZone = Constant()
+
+ShootingZone.near = 120
+ShootingZone.far = 250
@@ -11,6 +11,7 @@ from rev import MotorType, CANSparkMax
 
 from custom import driverhud
 import controller.layout
+from controller.genericcontroller import GenericController
 import subsystems 
 import shutil, sys
 
@@ -29,6 +30,7 @@ from subsystems.hood import Hood as hood
 from subsystems.turret import Turret as turret
 from subsystems.limelight import Limelight as limelight
 from subsystems.climber import Climber as climber
+from subsystems.firecontrol import FireControl as firecontrol
 
 from subsystems.falconbasedrive import FalconBaseDrive
 from subsystems.neobasedrive import NeoBaseDrive
@@ -62,6 +64,11 @@ class KryptonBot(CommandBasedRobot):
         
         self.subsystems()
 
+        if RobotBase.isSimulation():
+            from custom.limelightsim import LimelightSim
+            self.limelightSim = LimelightSim()
+            self.limelightSim.start()
+
         controller.layout.init()
         driverhud.init()
 
@@ -75,17 +82,47 @@ class KryptonBot(CommandBasedRobot):
         # Send field data to the dashboard
         driverhud.showField()
 
+        sys.modules['robot'].revolver.setBallCount(3) # The preload.
+
         # Schedule the autonomous command
         auton = driverhud.getAutonomousProgram()
         auton.start()
                 
         driverhud.showInfo("Starting %s" % auton)
 
+    def teleopInit(self):
+        '''Record the driver's inputs so the session can be replayed.'''
+
+        if RobotBase.isSimulation():
+            GenericController.startRecordingAll('recordings')
+        else:
+            GenericController.startRecordingAll('/home/lvuser/py/recordings')
+
+    def commandPeriodic(self):
+        '''Snapshot every controller once, then let the Scheduler run.'''
+
+        try:
+            GenericController.updateAll() # Bindings start commands from in here.
+        except Exception as error:
+            if not self.ds.isFMSAttached():
+                raise
+
+            '''Same as CommandBasedRobot does for the Scheduler: stop everything, keep running.'''
+            self.scheduler.removeAll()
+            self.handleCrash(error)
+
+        super().commandPeriodic()
+
+    teleopPeriodic = commandPeriodic
+    autonomousPeriodic = commandPeriodic
+    disabledPeriodic = commandPeriodic
+
     def disabledInit(self):
+        GenericController.stopRecordingAll()
         self.captureDisbaleVars()
 
     def handleCrash(self, error):
-        super().handleCrash()
+        super().handleCrash(error)
         driverhud.showAlert('Fatal Error: %s' % error)
 
     def captureDisbaleVars(self):
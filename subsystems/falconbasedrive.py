@@ -13,6 +13,7 @@ from ctre import WPI_TalonFX, ControlMode, NeutralMode, FeedbackDevice, Orchestr
 from navx import AHRS
 
 from custom.config import Config
+from custom import kinematics
 import ports
 
 from crapthatwillneverwork.simcansparkmax import SimCANSparkMax
@@ -103,16 +104,29 @@ class FalconBaseDrive(CougarSystem):
 
         self.setDefaultCommand(DriveCommand(self.speedLimit))
 
+    def periodic(self):
+        '''Every loop, whatever command is driving, so the pose is never stale.'''
+        self.updateOdometry()
+
     def updateOdometry(self):
         distance = self.getDistance()
         self.odometry.update(Rotation2d.fromDegrees(self.getHeadingWithLimit()), distance[0], distance[1])
 
     def getDistance(self):
-        return [(x / 10.71) * 0.47879 for x in self.getPositions()] # The weird float is the circumference of the wheel in meters.
+        positions = self.getPositions()
+        return [self.unitsToMeters(positions[0]), -self.unitsToMeters(positions[1])] # The right side runs reversed.
 
     def getWheelSpeeds(self): # Returns meters per second
-        mps = [((x / 60) / 10.71) * 0.47879 for x in self.getSpeeds()]
-        return DifferentialDriveWheelSpeeds(mps[0], mps[1])
+        speeds = self.getSpeeds()
+        return DifferentialDriveWheelSpeeds(self.unitsToMeters(speeds[0] * 10), -self.unitsToMeters(speeds[1] * 10)) # Velocity is per 100ms.
+
+    def unitsToMeters(self, units):
+        '''Converts encoder ticks into meters travelled by the wheel.'''
+        return ((units / 2048) / 10.71) * 0.47879 # The weird float is the circumference of the wheel in meters.
+
+    def metersPerSecondToUnits(self, mps):
+        '''Converts a wheel speed in meters per second into ticks per 100ms.'''
+        return ((mps / 0.47879) * 10.71 * 2048) / 10
 
     def getPoseMeters(self):
         return self.odometry.getPose()
@@ -144,14 +158,7 @@ class FalconBaseDrive(CougarSystem):
             y = math.copysign(max(abs(y) - self.deadband, 0), y)
             rotate = math.copysign(max(abs(rotate) - self.deadband, 0), rotate)
 
-        speeds = self._calculateSpeeds(x, y, rotate)
-
-        maxSpeed = 0
-        for speed in speeds:
-            maxSpeed = max(abs(speed), maxSpeed)
-
-        if maxSpeed > 1:
-            speeds = [x / maxSpeed for x in speeds]
+        speeds = kinematics.normalize(self._calculateSpeeds(x, y, rotate))
 
         '''Use speeds to feed motor output.'''
 
@@ -348,7 +355,7 @@ class FalconBaseDrive(CougarSystem):
     def getHeadingWithLimit(self):
         angle = self.getAngle()
         if angle > 180:
-            angle = 180 - angle
+            angle -= 360
 
         return angle
 
@@ -370,6 +377,18 @@ class FalconBaseDrive(CougarSystem):
         return self.navX.getAngle() % 360
 
 
+    def getContinuousAngle(self):
+        '''Gyro reading that keeps counting past 360 instead of wrapping.'''
+
+        return self.navX.getAngle()
+
+
+    def getYawRate(self):
+        '''How fast we are turning, in degrees per second. Clockwise is positive.'''
+
+        return self.navX.getRate()
+
+
     def getAngleTo(self, targetAngle):
         '''
         Returns the anglular distance from the given target. Values will be
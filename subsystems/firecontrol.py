@@ -0,0 +1,98 @@
+from .cougarsystem import *
+
+from wpilib import Timer
+from networktables import NetworkTables as nt
+
+import robot
+import math
+
+
+class FireControl(CougarSystem):
+    '''
+    Decides whether we are allowed to shoot. Every loop it checks the target,
+    turret, hood and flywheel against their tolerances. To become ready,
+    everything has to be inside its tight tolerance for a short dwell; once
+    ready, we stay ready until something leaves its looser one. When we
+    aren't ready, getReason() says what we are waiting on.
+    '''
+
+    def __init__(self):
+        super().__init__('FireControl')
+
+        disablePrints()
+
+        self.table = nt.getTable('FireControl')
+
+        '''
+        (name, error method, tolerance to become ready, tolerance to stay ready),
+        checked in order, so the reason is the first one that fails.
+        '''
+        self.checks = [
+            ('target', self.getTargetError, 0.4, 0.6),
+            ('turret', self.getTurretError, 1.5, 3.0), # Degrees.
+            ('hood', self.getHoodError, 0.75, 1.5), # Hood encoder degrees.
+            ('flywheel', self.getFlywheelError, 0.1, 0.2), # Seconds until at speed.
+        ]
+
+        self.dwellTime = 0.06 # Seconds everything has to stay aligned.
+
+        self.lead = 0 # Degrees the turret should be off the goal, set when shooting on the move.
+
+        self.ready = False
+        self.reason = 'target'
+        self.alignedSince = None
+
+    def periodic(self):
+        now = Timer.getFPGATimestamp()
+
+        self.reason = None
+        for name, error, enter, exit in self.checks:
+            tolerance = exit if self.ready else enter
+
+            if not error() <= tolerance:
+                self.reason = name
+                break
+
+        if self.reason is not None:
+            self.ready = False
+            self.alignedSince = None
+
+        elif not self.ready:
+            if self.alignedSince is None:
+                self.alignedSince = now
+
+            if now - self.alignedSince >= self.dwellTime:
+                self.ready = True
+            else:
+                self.reason = 'dwell'
+
+        self.table.putBoolean('ready', self.ready)
+        self.table.putString('reason', self.reason or 'ready')
+
+    def getTargetError(self):
+        if not robot.limelight.getTape():
+            return math.inf
+
+        return 1 - robot.limelight.getConfidence()
+
+    def getTurretError(self):
+        return abs(robot.limelight.getCompensatedX() + robot.turret.getAdjustment() + self.lead)
+
+    def getHoodError(self):
+        if not robot.hood.closedLoop:
+            return math.inf
+
+        return abs(robot.hood.getHoodPosition() - robot.hood.getTarget())
+
+    def getFlywheelError(self):
+        if robot.shooter.targetRPM <= 0 or not robot.shooter.isRecovered(): # Still in the last ball's dip.
+            return math.inf
+
+        return robot.shooter.getSpinUpTime()
+
+    def isReady(self):
+        return self.ready
+
+    def getReason(self):
+        '''What we are waiting on, or None when ready.'''
+        return self.reason
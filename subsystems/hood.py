@@ -9,6 +9,12 @@ import math
 from rev import CANSparkMax, MotorType, ControlType
 from custom.config import Config
 
+from wpilib import Notifier, MedianFilter
+from wpilib.controller import ProfiledPIDController
+from wpilib.trajectory import TrapezoidProfile
+
+import threading
+
 from networktables import NetworkTables as nt
 
 class Hood(CougarSystem):
@@ -45,8 +51,117 @@ class Hood(CougarSystem):
         self.llHeight = 19.5 # Height on robot.
         self.adjustment = 0
 
+        '''
+        One position controller for the hood, run at 200Hz in a Notifier. The
+        through-bore reading goes through a short median filter to throw out
+        the odd bad duty cycle, then a profiled PID moves the hood with the
+        profile's velocity fed forward. Positions are raw encoder degrees.
+        '''
+        self.period = 0.005
+        self.kS = 0.03 # Output to get the hood moving at all.
+        self.kV = 0.002 # Output per degree per second.
+        self.maxOutput = 0.5
+
+        self.positionController = ProfiledPIDController(
+            0.02, 0, 0.0005,
+            TrapezoidProfile.Constraints(120, 600), # Degrees per second (squared).
+            self.period
+        )
+        self.positionController.setTolerance(0.5)
+
+        self.positionFilter = MedianFilter(3)
+        self.position = self.getRawPosition()
+        self.closedLoop = False
+
+        '''
+        The through-bore sits before the last gear stage, so the hood itself
+        trails the reading by the lash whenever it last came down. Hood
+        positions are the reading as it would be with the hood pushed up from
+        below, which is how the shot map was tuned. Run CalibrateHoodLashCommand
+        to measure the lash; it is saved on disable.
+        '''
+        self.lash = self.get('lash', 4.0)
+        self.capture('lash', 'getLash')
+
+        self.hoodPosition = self.position
+        self.approach = 1
+        self.target = self.position
+        self.approachBand = 0.75 # Degrees the target has to move past the hood before we come at it from the other side.
+
+        self.lock = threading.Lock()
+
+        self.controlNotifier = Notifier(self._control)
+        self.controlNotifier.startPeriodic(self.period)
+
         self.zeroNetworkTables()
 
+    def _control(self):
+        '''Runs in the Notifier. Reads the hood and, if we have a target, drives it.'''
+
+        self.position = self.positionFilter.calculate(self.getRawPosition())
+
+        '''Pushing up drags the hood along, coming down it waits for the lash.'''
+        if self.position > self.hoodPosition:
+            self.hoodPosition = self.position
+        elif self.position < self.hoodPosition - self.lash:
+            self.hoodPosition = self.position + self.lash
+
+        with self.lock:
+            if not self.closedLoop:
+                return
+
+            output = self.positionController.calculate(self.position)
+            velocity = self.positionController.getSetpoint().velocity
+
+            if velocity != 0:
+                output += math.copysign(self.kS, velocity) + self.kV * velocity
+
+            self.motor.set(max(min(output, self.maxOutput), -self.maxOutput))
+
+    def setPosition(self, position):
+        '''
+        Sends the hood to a position, kept inside angleMin and angleMax. When
+        the hood has to come down, the reading has to go a lash further than
+        the hood does.
+        '''
+
+        position = max(min(position, self.angleMax), self.angleMin)
+
+        if position > self.hoodPosition + self.approachBand:
+            self.approach = 1
+        elif position < self.hoodPosition - self.approachBand:
+            self.approach = -1
+
+        goal = position if self.approach > 0 else position - self.lash
+
+        with self.lock:
+            if not self.closedLoop:
+                self.positionController.reset(self.position)
+                self.closedLoop = True
+
+            self.positionController.setGoal(goal)
+
+        self.target = position
+
+        return position
+
+    def getTarget(self):
+        '''The hood position we were last sent to, lash not included.'''
+        return self.target
+
+    def getHoodPosition(self):
+        '''Where the hood actually is, in the same units as getPosition.'''
+        return self.hoodPosition
+
+    def getLash(self):
+        return self.lash
+
+    def setLash(self, lash):
+        self.lash = max(lash, 0)
+
+    def atTarget(self):
+        return self.closedLoop and abs(self.positionController.getGoal().position - self.position) <= 0.5
+
     def mobileHoodControl(self, y, areaControl=None):
         oldY = y
         mod = 0
@@ -62,12 +177,19 @@ class Hood(CougarSystem):
             self.stopHood()
             return True
 
-        self.motor.set(math.copysign(max(min(0.6, abs(y / 80)), 0.03), -y))
+        self.setPercent(math.copysign(max(min(0.6, abs(y / 80)), 0.03), -y))
         return False
 
     def getPosition(self):
+        '''The filtered position, updated at 200Hz.'''
+        return self.position
+
+    def getRawPosition(self):
         return self.tbEnc.getOutput() * 360
 
+    def getLaunchAngle(self):
+        return ((self.angleMax - self.getHoodPosition()) / 2) + 8.84
+
     def increaseAdjustment(self, val):
         self.adjustment = self.adjustment + val
 
@@ -81,36 +203,40 @@ class Hood(CougarSystem):
         return self.adjustment
 
     def stopHood(self):
-        self.motor.stopMotor()
+        with self.lock:
+            self.closedLoop = False
+            self.motor.stopMotor()
 
     def setPercent(self, speed):
-        self.motor.set(speed)
+        with self.lock:
+            self.closedLoop = False
+            self.motor.set(speed)
 
     def raiseHood(self):
         if self.getPosition() < self.angleMax:
-            self.motor.set(0.1)
+            self.setPercent(0.1)
         else:
-            self.motor.stopMotor()
+            self.stopHood()
         self.updateNetworkTables(self.getPosition())
 
     def lowerHood(self):
         print('hood ' + str(self.getPosition()))
         if self.getPosition() > self.angleMin:
-            self.motor.set(-0.1)
+            self.setPercent(-0.1)
         else:
-            self.motor.stopMotor()
+            self.stopHood()
         self.updateNetworkTables(self.getPosition())
 
     def atHighest(self):
         if self.getPosition() >= self.angleMax:
-            self.motor.stopMotor()
+            self.stopHood()
             return True
         else:
             return False
 
     def atLowest(self):
         if self.getPosition() <= self.angleMin:
-            self.motor.stopMotor()
+            self.stopHood()
             return True
         else:
             return False
@@ -118,7 +244,7 @@ class Hood(CougarSystem):
     def updateNetworkTables(self, angle=85.00):
         self.table.putNumber('HoodAngle', round(self.getPosition(), 2))
         self.table.putNumber('DesiredHoodAngle', round(angle, 2))
-        self.table.putNumber('LaunchAngle', (((self.angleMax - self.getPosition()) / 2) + 8.84))
+        self.table.putNumber('LaunchAngle', self.getLaunchAngle())
         self.table.putNumber('HoodAdjustment', round(self.adjustment, 2))
 
     def zeroNetworkTables(self):
@@ -127,41 +253,22 @@ class Hood(CougarSystem):
         self.table.putNumber('LaunchAngle', self.angleMin)
 
     def OpenLoopSetPos(self, pos):
-        self.angle = pos # give it in terms between min and max as of now, add 85 onto an angle between 0 and 35,
-        # multiply that by 2: 85 + (2 * x). THIS WILL WORK
-        if abs(self.getPosition() - self.angle) >= 2: # this way is better, angle will not be negative. 2 degrees of play
-            self.rotate = .005 * (self.angle - self.getPosition()) # this should work
-            self.setPercent(self.rotate)
-        else:
-            self.stopHood()
+        self.setPosition(pos) # Not open loop anymore, the name stuck.
 
         self.updateNetworkTables(self.getPosition())
 
     def setShootAngle(self, angle):
         self.targetpos = self.angleMax - 2 * (angle - 8.84)
-        self.error = -1* (self.getPosition() - self.targetpos)
         if (self.angleMin < self.targetpos < self.angleMax):
-            if (abs(self.error) < .1):
-                self.stopHood()
-            else:
-                self.speed = self.error * .01
-                self.speed = math.copysign(min(0.5, abs(self.speed)), self.speed)
-                self.setPercent(self.speed)
+            self.setPosition(self.targetpos)
 
         return self.targetpos
 
 
     def setAngle(self, angle):
         self.targetpos = 260 - (2 * angle)
-        self.error = -1 * (self.getPosition() - self.targetpos)
         if (self.angleMin < self.targetpos < self.angleMax):
-            if (abs(self.error) < .1):
-                self.stopHood()
-            else:
-                self.speed = self.error * .03
-                if (abs(self.speed) > .5 ):
-                    self.speed = math.copysign(.5, self.speed)
-                self.setPercent(self.speed)
+            self.setPosition(self.targetpos)
 
     def benCalcAngle(self, distance):
         y = 0.194735542 * abs(distance) + 170.4104165
@@ -173,24 +280,12 @@ class Hood(CougarSystem):
         return self.benSetAngle(y)#self.parallelToGroundish - (theta * 2))
 
     def benSetAngle(self, desiredAngle):
+        self.setPosition(desiredAngle)
 
-        diff = self.getPosition() - desiredAngle
-
-        if abs(diff) <= 3.0:
-            self.stopHood()
-            return True
-
-        diff /= 120
-
-        val = math.copysign(min(abs(max(abs(diff / 130), 0.08)), 0.3), -diff)
-
-        self.motor.set(val)
-
-        return False
+        return self.atTarget()
 
     def goTo(self, angle): # angle is the raw encoder value.
-        pos = self.getPosition()
-        self.motor.set(math.copysign(max([0.3, (0.75 - max([angle / pos, pos / angle]))]), angle - pos)) # Damn, this is hot.
+        self.setPosition(angle)
 
     def estimateAngle(self):
         return abs(self.parallelToGroundish - self.getPosition()) / 2
@@ -206,7 +301,7 @@ class Hood(CougarSystem):
             self.stopHood()
             return True
         
-        self.motor.set(math.copysign(max(min(0.6, abs(y / 80)), 0.03), -y))
+        self.setPercent(math.copysign(max(min(0.6, abs(y / 80)), 0.03), -y))
         
         return False
     
@@ -216,7 +311,7 @@ class Hood(CougarSystem):
             self.stopHood()
             return True
         
-        self.motor.set(math.copysign(max(min(0.6, abs(y / 80)), 0.03), -y))
+        self.setPercent(math.copysign(max(min(0.6, abs(y / 80)), 0.03), -y))
     
         return False
     
@@ -8,7 +8,12 @@ import ports
 import robot
 import math
 from custom.config import Config
+from custom.targetfilter import TargetFilter
+from custom.distanceestimator import DistanceEstimator
 from networktables import NetworkTables
+from wpilib import Timer
+
+from collections import deque
 
 
 class Limelight(CougarSystem):
@@ -31,36 +36,168 @@ class Limelight(CougarSystem):
         self.TargetHeight = 98.25
         self.calDistance = 120
 
-        self.llHeight = 25 # Height on robot.
-        self.llAngle = 22 # Limelight angle in degrees, relative to the ground.
+        self.cameraPitch = 30.52289 # Degrees, calibrated so calcDistance reads right.
         self.swapArea = 1.5
         
         self.maxShooterRPM = 5600
         self.minShooterRPM = 3800
 
-        self.setPipeline(1)
+        '''
+        Commands ask for a pipeline with requestPipeline() and hand it back
+        with releasePipeline(). The newest request still held wins, and with
+        none held we go back to the default. Switching costs the camera a few
+        frames, so we only write when the pipeline really changes.
+        '''
+        self.defaultPipeline = 1
+        self.pipelineRequests = []
+        self.requestedPipeline = None
+
+        self.setPipeline(self.defaultPipeline)
 
         self.closeShot = True
 
+        '''
+        Every getter below reads the filtered target, updated once a loop in
+        periodic(). Use the getRaw methods to see the frame as it came in.
+        '''
+        self.targetFilter = TargetFilter()
+        self.lastFrame = None # The raw values of the last frame fed to the filter.
+        self.minConfidence = 0.4 # Below this, getTape() says we don't have a target.
+
+        '''
+        A frame shows what the camera saw tl milliseconds (plus the capture
+        time, which tl leaves out) ago. We keep a short history of the turret,
+        gyro and wheels so the compensated getters can move an old frame up to
+        now.
+        '''
+        self.captureLatency = 0.011 # Seconds.
+        self.motionHistory = deque(maxlen=25) # (time, turret angle, heading, inches driven), half a second of loops.
+
+        '''Fuses the angle, area and camtran distances, once per frame.'''
+        self.distanceEstimator = DistanceEstimator(self.TargetHeight, self.LimelightHeight, self.cameraPitch)
+
         #self.calAngle = math.atan((self.TargetHeight-self.LimelightHeight)/self.calDistance)
         #print(str(self.calAngle))
 
     def setPipeline(self, pipeline: int):
+        if pipeline == self.requestedPipeline:
+            return
+
+        self.requestedPipeline = pipeline
         self.nt.putNumber('pipeline', pipeline)
 
-    def getY(self):
-        return self.nt.getEntry('tx').getDouble(0)
+    def requestPipeline(self, pipeline: int):
+        self.pipelineRequests.append(pipeline)
+        self.setPipeline(pipeline)
+
+    def releasePipeline(self, pipeline: int):
+        for i in range(len(self.pipelineRequests) - 1, -1, -1):
+            if self.pipelineRequests[i] == pipeline:
+                del self.pipelineRequests[i]
+                break
+
+        self.setPipeline(self.pipelineRequests[-1] if self.pipelineRequests else self.defaultPipeline)
+
+    def releaseAllPipelines(self):
+        self.pipelineRequests.clear()
+        self.setPipeline(self.defaultPipeline)
+
+    def getPipeline(self):
+        '''The pipeline the camera says it is running.'''
+        return int(self.nt.getEntry('getpipe').getDouble(-1))
+
+    def isPipelineActive(self):
+        '''False until the camera has switched to the pipeline we asked for.'''
+        return self.getPipeline() == self.requestedPipeline
+
+    def periodic(self):
+        now = Timer.getFPGATimestamp()
+
+        tv = self.getRawTape() and self.isPipelineActive() # Frames from the old pipeline aren't our target.
+        frame = (self.getRawY(), self.getRawX(), self.getRawA(), self.nt.getEntry('ts').getDouble(0), self.getLatency())
+
+        '''
+        The loop runs faster than the camera, so only feed a target frame
+        once. Without a target we keep feeding, so losing it is timed by the loop.
+        '''
+        if not tv or frame != self.lastFrame:
+            self.targetFilter.update(tv, *frame[:4], now - frame[4] / 1000 - self.captureLatency)
+
+        self.lastFrame = frame if tv else None
+
+        driven = sum(robot.drivetrain.getDistance()) / 2 * 39.37
+        self.motionHistory.append((now, robot.turret.getRobotAngle(), robot.drivetrain.getContinuousAngle(), driven))
+
+    def getCaptureTime(self):
+        '''FPGA time the filtered target was seen at.'''
+        return self.targetFilter.timestamp
+
+    def _motionSince(self, timestamp):
+        '''
+        How far the turret turned, the robot turned and the robot drove
+        between timestamp and the last loop, interpolating the history.
+        '''
+
+        if len(self.motionHistory) < 2:
+            return 0.0, 0.0, 0.0
+
+        history = list(self.motionHistory)
+        latest = history[-1]
+        then = history[0] # Older than we remember, so use the oldest we have.
+
+        for i in range(len(history) - 1, 0, -1):
+            older, newer = history[i - 1], history[i]
+
+            if older[0] <= timestamp:
+                fraction = 0
+                if newer[0] > older[0]:
+                    fraction = min((timestamp - older[0]) / (newer[0] - older[0]), 1)
+
+                then = [a + (b - a) * fraction for a, b in zip(older, newer)]
+                break
+
+        return latest[1] - then[1], latest[2] - then[2], latest[3] - then[3]
+
+    def getCompensatedX(self):
+        '''
+        The horizontal offset to the goal as it is now, not when the frame was
+        taken. Turning the turret or the robot clockwise moves the goal
+        counter-clockwise in the camera.
+        '''
+
+        turretTurned, robotTurned, driven = self._motionSince(self.getCaptureTime())
+
+        return self.getX() - turretTurned - robotTurned
+
+    def getY(self): # The Limelight is on its side, so its tx is our y.
+        return self.targetFilter.tx
 
     def getX(self):
-        return self.nt.getEntry('ty').getDouble(0)
+        return self.targetFilter.ty
 
     def getA(self):
+        return self.targetFilter.ta
+
+    def getConfidence(self):
+        return self.targetFilter.getConfidence()
+
+    def getRawY(self):
+        return self.nt.getEntry('tx').getDouble(0)
+
+    def getRawX(self):
+        return self.nt.getEntry('ty').getDouble(0)
+
+    def getRawA(self):
         return self.nt.getEntry('ta').getDouble(0)
 
+    def getRawTape(self):
+        return self.nt.getEntry('tv').getDouble(0) == 1
+
+    def getLatency(self): # Pipeline latency in milliseconds.
+        return self.nt.getEntry('tl').getDouble(0)
+
     def getTape(self):
-        if (self.nt.getEntry('tv').getDouble(0) == 1):
-            return True
-        return False
+        return self.targetFilter.hasTarget() and self.getConfidence() >= self.minConfidence
 
     def getCamTran(self):
         return self.nt.getEntry('camtran').getDoubleArray([])
@@ -89,24 +226,34 @@ class Limelight(CougarSystem):
     def generateVelocity(self, area, limit, longShot=False): # Returns the calculated velocity based off of the distance, in inches.
         return min(self.minShooterRPM + (limit - abs(area) / 0.0007), self.maxShooterRPM)
         
-    def calcDistance(self):
-        self.height = self.TargetHeight - self.LimelightHeight
-        #self.angle = self.calAngle  + math.radians(Limelight.getY(self))
-        self.angle = math.radians(30.52289 + self.getY())
-        self.distance = self.height/math.tan(self.angle)
+    def getDistance(self):
+        '''
+        The distance to the goal, in inches, that the shot map is indexed by.
+        Whatever we drove toward the goal since the frame was taken is taken off.
+        '''
 
-        return self.distance
+        if not robot.turret.isZeroed(): # Without the turret angle we can't tell how much of the driving was toward the goal.
+            return self.getTargetDistance()
 
-    def calcDistanceGood(self):
-        self.height = 77.25
-        self.angle = math.radians(30.52289 + self.getY())
-        self.distance = self.height/math.tan(self.angle)
-        #print(str(self.distance))
-        return self.distance
+        turretTurned, robotTurned, driven = self._motionSince(self.getCaptureTime())
+        bearing = math.radians(robot.turret.getRobotAngle() + self.getCompensatedX())
 
-    def areaDistance(self):
-        self.aDistance = math.log(self.getA(), .992924) + 221.996
-        return self.aDistance
+        return self.getTargetDistance() - driven * math.cos(bearing)
+
+    def getTargetDistance(self):
+        '''The fused distance when the frame was taken. Use getDistance() to aim with.'''
+        return self.distanceEstimator.estimate(self.getY(), self.getA(), self.getCamTran(), self.getCaptureTime())
+
+    def getDistanceDeviation(self):
+        '''Standard deviation of the fused distance, in inches.'''
+        self.getTargetDistance()
+        return self.distanceEstimator.getStandardDeviation()
+
+    def calcDistance(self): # Just the pitch-angle model.
+        return self.distanceEstimator.angleModel(self.getY(), self.getA(), []) or 0
+
+    def areaDistance(self): # Just the area model.
+        return self.distanceEstimator.areaModel(self.getY(), self.getA(), []) or 0
 
     def onTarget(self):
         if self.getTape():
@@ -125,19 +272,18 @@ class Limelight(CougarSystem):
 
     def calcXDistance(self):
         self.theta = self.getFeildAngle()
-        self.d = self.calcDistance()
+        self.d = self.getDistance()
         self.xD = math.sin(math.radians(self.theta)) * self.d
         return self.xD
 
     def calcYDistance(self):
         self.theta = self.getFeildAngle()
-        self.d = self.calcDistance()
+        self.d = self.getDistance()
         self.yD = math.cos(math.radians(self.theta)) * self.d
         return self.yD
 
-    def bensDistance(self, llAngle):
-        return (98.25 - self.llHeight) / (math.tan(math.radians(llAngle + self.getY())))
-
     def updateNetworkTables(self):
+        self.driveTable.putNumber('targetConfidence', self.getConfidence())
         self.driveTable.putNumberArray('camTran', self.getCamTran())
-        self.driveTable.putNumber('distance', self.calcDistance())
+        self.driveTable.putNumber('distance', self.getDistance())
+        self.driveTable.putNumber('distanceDeviation', self.getDistanceDeviation())
@@ -1,60 +1,55 @@
-import math
-from wpilib.drive.robotdrivebase import RobotDriveBase
+from custom import kinematics
 
-from .basedrive import BaseDrive
+def selectDT(parent):
 
-class MecanumDrive(BaseDrive):
-    '''
-    A drive base with four wheels, each independently driven. Due to the rollers
-    placed at forty-five degree angles around the wheels, the robot can drive
-    sideways, as well as forward and rotating, depending on how the motors are
-    driven.
-    '''
+    class MecanumDrive(parent):
+        '''
+        A drive base with four wheels, each independently driven. Due to the rollers
+        placed at forty-five degree angles around the wheels, the robot can drive
+        sideways, as well as forward and rotating, depending on how the motors are
+        driven.
+        '''
 
-    def __init__(self, name):
-        super().__init__(name)
+        def __init__(self, name):
+            self.isFieldOriented = False
+            self.fieldOrientation = kinematics.FieldOrientation()
 
-        self.isFieldOriented = False
+            super().__init__(name)
 
 
-    def setUseFieldOrientation(self, isFieldOriented=True):
-        '''
-        If set to true, the robot will drive the direction the joystick is
-        moved (assuming the robot started facing the "up" direction), without
-        regard to where the front of the robot is facing.
-        '''
+        def setUseFieldOrientation(self, isFieldOriented=True):
+            '''
+            If set to true, the robot will drive the direction the joystick is
+            moved (assuming the robot started facing the "up" direction), without
+            regard to where the front of the robot is facing.
+            '''
+
+            self.isFieldOriented = isFieldOriented
 
-        self.isFieldOriented = isFieldOriented
+        def _configureMotors(self):
+            '''All four motors are active in a mecanum system.'''
 
-    def _configureMotors(self):
-        '''All four motors are active in a mecanum system.'''
+            self.activeMotors = self.motors
+            self.speeds = [0.0] * 4
 
-        self.activeMotors = self.motors
+            try:
 
-        '''Invert the motors on the left side.'''
-        self.motors[RobotDriveBase.MotorType.kFrontLeft].reverseSensor(True)
-        self.motors[RobotDriveBase.MotorType.kRearLeft].reverseSensor(True)
+                self.activePIDControllers = [y.getPIDController() for y in self.activeMotors]
+                self.activeEncoders = [y.getEncoder() for y in self.activeMotors]
 
+            except(AttributeError):
 
-    def _calculateSpeeds(self, x, y, rotate):
-        '''Determines what speed each motor should have.'''
+                self.activePIDControllers = []
+                self.activeEncoders = []
 
-        if self.isFieldOriented:
-            '''Fancy math changes x and y based on gyro reading.'''
-            heading = self.getAngle() * math.pi / 180
 
-            cosA = math.cos(heading)
-            sinA = math.sin(heading)
+        def _calculateSpeeds(self, x, y, rotate):
+            '''Determines what speed each motor should have.'''
 
-            newX = x * cosA - y * sinA
-            newY = x * sinA + y * cosA
+            if self.isFieldOriented:
+                '''Fancy math changes x and y based on gyro reading.'''
+                x, y = self.fieldOrientation.rotate(x, y, self.getAngle())
 
-            x = newX
-            y = newY
+            return kinematics.mecanumSpeeds(x, y, rotate, self.speeds)
 
-        return [
-            x + y + rotate,
-            x - y + rotate,
-            -x + y + rotate,
-            -x - y + rotate
-        ]
+    return MecanumDrive
@@ -13,6 +13,7 @@ from rev import CANSparkMax, ControlType, MotorType, IdleMode, CANPIDController
 from navx import AHRS
 
 from custom.config import Config
+from custom import kinematics
 import ports
 
 from crapthatwillneverwork.simcansparkmax import SimCANSparkMax
@@ -102,16 +103,29 @@ class NeoBaseDrive(CougarSystem):
 
         self.setDefaultCommand(DriveCommand(self.speedLimit))
 
+    def periodic(self):
+        '''Every loop, whatever command is driving, so the pose is never stale.'''
+        self.updateOdometry()
+
     def updateOdometry(self):
         distance = self.getDistance()
         self.odometry.update(Rotation2d.fromDegrees(self.getHeadingWithLimit()), distance[0], distance[1])
 
     def getDistance(self):
-        return [(x / 10.71) * 0.47879 for x in self.getPositions()] # The weird float is the circumference of the wheel in meters.
+        positions = self.getPositions()
+        return [self.unitsToMeters(positions[0]), -self.unitsToMeters(positions[1])] # The right side runs reversed.
 
     def getWheelSpeeds(self): # Returns meters per second
-        mps = [((x / 60) / 10.71) * 0.47879 for x in self.getSpeeds()]
-        return DifferentialDriveWheelSpeeds(mps[0], mps[1])
+        speeds = self.getSpeeds()
+        return DifferentialDriveWheelSpeeds(self.unitsToMeters(speeds[0] / 60), -self.unitsToMeters(speeds[1] / 60)) # Velocity is in RPM.
+
+    def unitsToMeters(self, rotations):
+        '''Converts motor rotations into meters travelled by the wheel.'''
+        return (rotations / 10.71) * 0.47879 # The weird float is the circumference of the wheel in meters.
+
+    def metersPerSecondToUnits(self, mps):
+        '''Converts a wheel speed in meters per second into motor RPM.'''
+        return (mps / 0.47879) * 10.71 * 60
 
     def getPoseMeters(self):
         return self.odometry.getPose()
@@ -142,14 +156,7 @@ class NeoBaseDrive(CougarSystem):
             y = math.copysign(max(abs(y) - self.deadband, 0), y)
             rotate = math.copysign(max(abs(rotate) - self.deadband, 0), rotate)
 
-        speeds = self._calculateSpeeds(x, y, rotate)
-
-        maxSpeed = 0
-        for speed in speeds:
-            maxSpeed = max(abs(speed), maxSpeed)
-
-        if maxSpeed > 1:
-            speeds = [x / maxSpeed for x in speeds]
+        speeds = kinematics.normalize(self._calculateSpeeds(x, y, rotate))
 
         '''Use speeds to feed motor output.'''
         if self.useEncoders:
@@ -368,7 +375,7 @@ class NeoBaseDrive(CougarSystem):
     def getHeadingWithLimit(self):
         angle = self.getAngle()
         if angle > 180:
-            angle = 180 - angle
+            angle -= 360
 
         return angle
 
@@ -390,6 +397,18 @@ class NeoBaseDrive(CougarSystem):
         return self.navX.getAngle() % 360
 
 
+    def getContinuousAngle(self):
+        '''Gyro reading that keeps counting past 360 instead of wrapping.'''
+
+        return self.navX.getAngle()
+
+
+    def getYawRate(self):
+        '''How fast we are turning, in degrees per second. Clockwise is positive.'''
+
+        return self.navX.getRate()
+
+
     def getAngleTo(self, targetAngle):
         '''
         Returns the anglular distance from the given target. Values will be
@@ -537,9 +556,9 @@ class NeoBaseDrive(CougarSystem):
 
         table.addSubTableListener(updatePID, localNotify=True)
 
-    def setSpeeds(self, speedLeft, speedRight): # DON'T USE THIS
-        self.activeMotors[0].getPIDController().setReference(speedLeft, ControlType.kVelocity, 0, 0)
-        self.activeMotors[1].getPIDController().setReference(speedRight, ControlType.kVelocity, 0, 0)
+    def setSpeeds(self, speedLeft, speedRight): # Same sign convention as the Falcon drive.
+        self.activeMotors[0].getPIDController().setReference(-speedLeft, ControlType.kVelocity, 0, 0)
+        self.activeMotors[1].getPIDController().setReference(-speedRight, ControlType.kVelocity, 0, 0)
 
     def setProfile(self, num):
         return
@@ -4,10 +4,16 @@ from wpilib import DigitalInput, AnalogInput, I2C
 
 from .cougarsystem import *
 
+from networktables import NetworkTables as nt
+
 from rev import ControlType, CANSparkMax, MotorType, IdleMode
 from rev.color import ColorSensorV3
 
+from custom.ballinventory import BallInventory
+from custom.colorsensorpoller import ColorSensorPoller
+
 import ports
+import robot
 import wpilib
 
 class Revolver(CougarSystem):
@@ -45,6 +51,10 @@ class Revolver(CougarSystem):
 
         self.frontSensor.configureProximitySensor(ColorSensorV3.ProximityResolution.k11bit, ColorSensorV3.ProximityMeasurementRate.k100ms)
 
+        '''Read on a thread at the 100ms measurement rate, so the loop never waits on I2C.'''
+        self.frontPoller = ColorSensorPoller(self.frontSensor, 0.1)
+        self.frontPoller.start()
+
         self.holeLocations = [9, 81, 153, 225, 297]
         self.dropPositions = [317.5] # The middle of the drop zones. Zones must be five degrees wide.
 
@@ -55,6 +65,54 @@ class Revolver(CougarSystem):
         
         self.defaultCheck = False
         self.seen = False
+        self.seenAt = -1
+
+        self.table = nt.getTable('Revolver')
+
+        '''
+        Which chambers hold a ball, updated from the sensors in periodic(). A
+        chamber is lined up with the intake when getPosition() reads its hole
+        location, and over the drop dropAngle degrees later, where the middle
+        of the drop zone (dropPositions, same as inDropZone) is past the hole
+        before it.
+        '''
+        self.inventory = BallInventory(len(self.holeLocations))
+        self.dropAngle = min((self.dropPositions[0] - x) % 360 for x in self.holeLocations)
+
+    def periodic(self):
+        if self.inventory.update(
+            not self.isFrontEmpty(),
+            not self.isEmpty(),
+            self.getChamberAt(0),
+            self.getChamberAt(self.dropAngle),
+            robot.shooter.getShotCount()
+        ):
+            self.table.putNumber('BallCount', self.getBallCount())
+            self.table.putBooleanArray('Chambers', self.inventory.getChambers())
+
+    def getChamberAt(self, angle):
+        '''The chamber closest to angle degrees past the intake.'''
+
+        position = self.getPosition() - angle
+
+        return min(
+            range(len(self.holeLocations)),
+            key=lambda i: abs((position - self.holeLocations[i] + 180) % 360 - 180)
+        )
+
+    def getBallCount(self):
+        return self.inventory.getCount()
+
+    def setBallCount(self, balls):
+        '''For preloads: fills the first few chambers, starting at the drop.'''
+
+        drop = self.getChamberAt(self.dropAngle)
+        chambers = len(self.holeLocations)
+
+        self.inventory.reset([(i - drop) % chambers < balls for i in range(chambers)])
+
+    def isFull(self):
+        return self.inventory.isFull()
 
     def setCustomRR(self, rr):
         self.motor.setOpenLoopRampRate(rr)
@@ -76,7 +134,12 @@ class Revolver(CougarSystem):
         self.motor.stopMotor()
 
     def isFrontEmpty(self):
-        return (self.frontSensor.getProximity() <= 160)
+        proximity, timestamp, stale = self.frontPoller.getLatest()
+
+        return stale or proximity <= 160 # Don't count balls off a reading we can't trust.
+
+    def getFrontProximity(self):
+        return self.frontPoller.getProximity()
 
     def inDropZone(self):
         return (305 <= self.getPosition() <= 330)
@@ -122,13 +185,17 @@ class Revolver(CougarSystem):
         return self.isSpinning
     
     def sawItAt(self):
-        if not self.zoneSensorOne.getValue() >= 50 and not self.seen:
-            yield self.getPosition()
-            self.seen = True
-            
-        elif self.zoneSensorOne.getVaue() >= 50:
-            yield -1 # Don't have anything
+        '''The position the first zone sensor first saw a ball at, or -1 if it doesn't see one.'''
+
+        if self.zoneSensorOne.getValue() >= 50:
             self.seen = False
+            return -1 # Don't have anything
+
+        if not self.seen:
+            self.seenAt = self.getPosition()
+            self.seen = True
+
+        return self.seenAt
             
     def enableDefaultChecking(self):
         self.defaultCheck = True
@@ -2,11 +2,22 @@ from wpilib.command import Subsystem
 
 from .cougarsystem import *
 
-from ctre import WPI_TalonFX, FeedbackDevice, ControlMode, NeutralMode
+from ctre import WPI_TalonFX, FeedbackDevice, ControlMode, NeutralMode, DemandType, StatusFrameEnhanced, VelocityMeasPeriod
+
+from wpilib import RobotController, RobotBase, Timer, Notifier
 
 from networktables import NetworkTables as nt
 
+from custom.shotmap import ShotMap
+from custom.flywheelmodel import FlywheelModel
+from custom.shotlogger import ShotLogger
+from custom.ballexitdetector import BallExitDetector
+
+from collections import deque
+
 import ports
+import robot
+import math
 
 class Shooter(CougarSystem):
     '''Describe what this subsystem does.'''
@@ -27,8 +38,17 @@ class Shooter(CougarSystem):
         self.shooterMotorOne.setNeutralMode(NeutralMode.Coast)
         self.shooterMotorTwo.setNeutralMode(NeutralMode.Coast)
 
-        self.shooterMotorOne.config_kF(0, 0.055, 0) # TODO: Raise this a bit. 
-        self.shooterMotorOne.config_kP(0, 0.165, 0)
+        '''
+        Compensate to a fixed voltage so the feedforward means the same thing
+        on a tired battery. The model provides the feedforward, so kF is zero.
+        '''
+        self.compensationVoltage = 11.0
+        self.shooterMotorOne.configVoltageCompSaturation(self.compensationVoltage, 0)
+        self.shooterMotorOne.enableVoltageCompensation(True)
+
+        self.shooterMotorOne.config_kF(0, 0, 0)
+        self.kP = 0.165
+        self.shooterMotorOne.config_kP(0, self.kP, 0)
         self.shooterMotorOne.config_kI(0, 0, 0)
         self.shooterMotorOne.config_kD(0, 0.0001, 0)
         self.shooterMotorOne.config_IntegralZone(0, 0, 0)
@@ -40,13 +60,170 @@ class Shooter(CougarSystem):
 
         self.shooting = False
         self.atGoal = False
+        self.targetRPM = 0
+
+        '''
+        Placeholder constants until they are refit from a step response, see
+        CharacterizeShooterCommand and custom/flywheelmodel.py.
+        '''
+        self.flywheel = FlywheelModel(kS=0.25, kV=0.00182, kA=0.0009)
+
+        self.readyTolerance = 75 # RPM
+        self.feedDelay = 0.1 # Seconds from starting the launcher to a ball touching the flywheel.
 
         self.maxVel = 5800 # Experimental velocities.
         self.minVel = 2800
 
+        self.shotMap = ShotMap() # Shared with the hood.
+
+        if RobotBase.isSimulation():
+            self.shotLogger = ShotLogger('shots.bin')
+        else:
+            self.shotLogger = ShotLogger('/home/lvuser/py/shots/shots.bin')
+
+        '''
+        Watch the flywheel at 200Hz for the dip each ball makes on the way out.
+        The velocity frame and measurement window are shortened to match, or
+        the Talon averages the dips away before we see them.
+        '''
+        self.shooterMotorOne.setStatusFramePeriod(StatusFrameEnhanced.Status_2_Feedback0, 5, 0)
+        self.shooterMotorOne.configVelocityMeasurementPeriod(VelocityMeasPeriod.Period_5Ms, 0)
+        self.shooterMotorOne.configVelocityMeasurementWindow(8, 0)
+
+        self.exitDetector = BallExitDetector()
+        self.pendingExits = deque() # Exit times from the Notifier, logged on the main loop.
+        self.exitNotifier = Notifier(self._watchForExits)
+        self.exitNotifier.startPeriodic(0.005)
+
     def setRPM(self, rpm):
+        '''Asking for more than the compensated voltage can hold gets the most it can.'''
+
+        rpm = min(rpm, self.flywheel.maxRPM(self.compensationVoltage))
+
+        self.shooting = True
+        self.targetRPM = rpm
+
+        feedforward = self.flywheel.calculate(rpm) / self.compensationVoltage
+
+        self.shooterMotorOne.set(
+            ControlMode.Velocity,
+            self.rpmToSensor(rpm),
+            DemandType.ArbitraryFeedforward,
+            feedforward
+        )
+
+    def setVoltage(self, volts):
         self.shooting = True
-        self.shooterMotorOne.set(ControlMode.Velocity, self.rpmToSensor(rpm))
+        self.shooterMotorOne.set(ControlMode.PercentOutput, volts / self.compensationVoltage)
+
+    def getVoltsPerRPM(self):
+        '''The velocity loop's kP, turned from Talon units into volts per RPM of error.'''
+        return self.kP * self.rpmToSensor(1) / 1023 * self.compensationVoltage
+
+    def getOutputVoltage(self):
+        return self.shooterMotorOne.getMotorOutputVoltage()
+
+    def getSpinUpTime(self, targetRPM=None, currentRPM=None):
+        '''
+        Predicts the seconds until the flywheel is within readyTolerance of
+        the target, with the Talon's velocity loop limited to whatever
+        voltage the battery can give right now. On a sagging battery a
+        target it can't hold counts as the fastest it can go.
+        '''
+
+        if targetRPM is None:
+            targetRPM = self.targetRPM
+
+        if currentRPM is None:
+            currentRPM = abs(self.getRPM())
+
+        error = targetRPM - currentRPM
+        if abs(error) <= self.readyTolerance:
+            return 0.0
+
+        volts = min(RobotController.getBatteryVoltage(), self.compensationVoltage)
+
+        if error > 0:
+            return self.flywheel.closedLoopTimeToReach(
+                currentRPM,
+                targetRPM,
+                self.readyTolerance,
+                volts,
+                self.getVoltsPerRPM()
+            )
+
+        return self.flywheel.timeToReach(
+            currentRPM,
+            targetRPM - math.copysign(self.readyTolerance, error),
+            volts
+        )
+
+    def isReady(self):
+        '''
+        True once the flywheel will have recovered by the time a ball fed now
+        reaches it. The dip from a ball only lasts a few hundredths of a
+        second, which the model alone would call ready straight through, so
+        we also wait for the exit detector to see the speed come back.
+        '''
+
+        if self.targetRPM <= 0 or not self.isRecovered():
+            return False
+
+        return self.getSpinUpTime() <= self.feedDelay
+
+    def isRecovered(self):
+        '''False from a ball leaving until the flywheel is back near speed.'''
+        return self.exitDetector.isRecovered()
+
+    def updateReadiness(self):
+        self.atGoal = self.isReady()
+        return self.atGoal
+
+    def periodic(self):
+        while self.pendingExits:
+            self.logShot(self.pendingExits.popleft())
+
+    def logShot(self, timestamp=None):
+        '''Records everything that went into a shot, for refitting the shot map.'''
+
+        limelight = robot.limelight
+
+        self.shotLogger.log(
+            timestamp=Timer.getFPGATimestamp() if timestamp is None else timestamp,
+            tv=limelight.getTape(),
+            tx=limelight.getY(), # The Limelight is mounted sideways.
+            ty=limelight.getX(),
+            ta=limelight.getA(),
+            tl=limelight.getLatency(),
+            distance=limelight.getDistance(),
+            targetRPM=self.targetRPM,
+            rpm=abs(self.getRPM()),
+            hoodPosition=robot.hood.getPosition(),
+            launchAngle=robot.hood.getLaunchAngle(),
+            turretPosition=robot.turret.getPosition(),
+            pressure=robot.pneumatics.getAnalogPressureSensor(),
+            battery=RobotController.getBatteryVoltage()
+        )
+
+    def _watchForExits(self):
+        '''Runs in the Notifier, not the main loop.'''
+
+        now = Timer.getFPGATimestamp()
+
+        if self.exitDetector.update(now, abs(self.getRPM()), self.targetRPM):
+            self.pendingExits.append(now) # Logging touches the file and other subsystems, so leave it to the main loop.
+            self.table.putNumber('ShotCount', self.exitDetector.getShots())
+            self.table.putNumber('ShotInterval', self.exitDetector.lastInterval)
+
+    def getShotCount(self):
+        '''Balls seen leaving since the robot turned on. Compare against an earlier count.'''
+        return self.exitDetector.getShots()
+
+    def getLastExitTime(self):
+        return self.exitDetector.getLastExit()
+
+    def getShotIntervals(self):
+        return self.exitDetector.getIntervals()
 
     def setPercent(self, val):
         self.shooting = True
@@ -60,6 +237,8 @@ class Shooter(CougarSystem):
         self.shooterMotorOne.stopMotor()
 
         self.shooting = False
+        self.atGoal = False
+        self.targetRPM = 0
     
     def updateNetworkTables(self):
         self.table.putNumber('ShooterRPM', round(self.getRPM(), 0))
@@ -80,3 +259,12 @@ class Shooter(CougarSystem):
 
     def getRPM(self): # Returns the average RPM
         return (self.sensorToRPM(self.shooterMotorOne.getSelectedSensorVelocity()))
+
+    def initDefaultCommand(self):
+        '''
+        By default, spin the flywheel up ahead of time when we are heading
+        into shooting range.
+        '''
+        from commands.shooter.prespincommand import PreSpinCommand
+
+        self.setDefaultCommand(PreSpinCommand())
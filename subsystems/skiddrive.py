@@ -1,5 +1,6 @@
 from ctre import ControlMode
 from wpilib.drive import RobotDriveBase
+from custom import kinematics
 import ports
 
 def selectDT(parent):
@@ -11,6 +12,7 @@ def selectDT(parent):
             '''Only the front motors are active in a skid system.'''
             
             self.activeMotors = self.motors[0:2]
+            self.speeds = [0.0, 0.0]
 
             '''Make the back motors follow the front.'''
             if len(self.motors) == 4:
@@ -35,6 +37,6 @@ def selectDT(parent):
 
 
         def _calculateSpeeds(self, x, y, rotate):
-            return [y + rotate, -y + rotate]
+            return kinematics.skidSpeeds(x, y, rotate, self.speeds)
         
     return SkidDrive
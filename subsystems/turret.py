@@ -6,12 +6,13 @@ from wpilib.command import Subsystem
 from wpilib.controller import PIDController
 
 import ports
-from ctre import ControlMode, FeedbackDevice, WPI_TalonSRX, NeutralMode
+from ctre import ControlMode, FeedbackDevice, WPI_TalonSRX, NeutralMode, DemandType
 
 from networktables import NetworkTables as nt
 
 import robot
 import math
+import fieldconstants
 
 class Turret(CougarSystem):
     '''Describe what this subsystem does.'''
@@ -22,15 +23,32 @@ class Turret(CougarSystem):
         disablePrints()
         
         self.motor = WPI_TalonSRX(ports.turret.motorID)
+        self.kF = 0.07
         self.motor.config_kP(0, 3.9, 0)
         self.motor.config_kI(0, 0, 0)
         self.motor.config_kD(0, 30, 0)
-        self.motor.config_kF(0, 0.07, 0)
+        self.motor.config_kF(0, self.kF, 0)
+
+        '''Motion Magic limits for field tracking, in ticks per 100ms (and per second).'''
+        self.motor.configMotionCruiseVelocity(300, 0)
+        self.motor.configMotionAcceleration(900, 0)
+
+        self.ticksPerDegree = 4096 / 360
 
         self.max = 1365 # Max value
         self.middle = 957.5
         self.min = 650.0 # Min value
 
+        '''
+        The position where the shooter faces the front of the robot. Every
+        robot-relative turret angle is measured from it. It starts at the
+        middle of the travel; to set it, line the shooter up with the front
+        of the robot and run SetTurretStraightAheadCommand. It is saved on
+        disable.
+        '''
+        self.straightAhead = self.get('straightAhead', self.middle)
+        self.capture('straightAhead', 'getStraightAhead')
+
         self.turretActiveMode = True
         self.onTarget = False
 
@@ -50,18 +68,50 @@ class Turret(CougarSystem):
 
         self.adjustment = 0
 
+        '''
+        With no target in view, we point at where odometry says the goal is.
+        Whenever vision does see it, we learn how far off odometry was, so the
+        next pre-aim lands closer.
+        '''
+        self.goalCorrection = 0.0 # Degrees added to the odometry bearing.
+        self.correctionGain = 0.1 # Fraction of the error learned each loop.
+
         #self.capture('position', 'getPosition')
 
         #print('\n\n received ' + str(self.get('position', 'ewwwwwwww')) + '\n\n')
 
         #self.motor.setSelectedSensorPosition(self.get('position', 0.0), 0, 0)
         self.motor.setSelectedSensorPosition(0, 0, 0)
+
+        '''
+        The Talon enforces the travel limits itself at 1kHz, so nothing here
+        has to check them before driving. We start at zero, below min, so the
+        turret can only head toward the limit switch until it has been zeroed.
+        '''
+        self.motor.configForwardSoftLimitThreshold(int(self.max), 0)
+        self.motor.configReverseSoftLimitThreshold(int(self.min), 0)
+        self.motor.configForwardSoftLimitEnable(True, 0)
+        self.motor.configReverseSoftLimitEnable(True, 0)
+
+        self.switchPressed = False
+        self.zeroed = False
+
+    def periodic(self):
+        '''
+        The limit switch is wired to the RIO, not the Talon, so re-zero here.
+        Only the moment it closes resets the encoder.
+        '''
+
+        pressed = self.isLimitSwitch()
+
+        if pressed and not self.switchPressed:
+            self.setMax()
+            self.zeroed = True
+
+        self.switchPressed = pressed
+
     def rotateClockwise(self, val):
-        if self.getPosition() < self.max and self.getPosition() > self.min:
-            self.motor.set(val)
-            return False
-        else:
-            self.stop()
+        self.motor.set(val)
 
     def increaseAdjustment(self, val):
         self.adjustment = self.adjustment - val
@@ -76,33 +126,15 @@ class Turret(CougarSystem):
         return self.adjustment
 
     def move(self, val):
-        if self.isMin() and val < 0:
-            self.stop() # does not let a positive direction proceed if zeroed.
-        elif self.isMax() and val > 0:
-            self.stop() # does not let a negative direction proceed if maxed.
-        else:
-            self.motor.set(val)
+        self.motor.set(val) # The soft limits stop us at either end.
 
     def testMove(self, val): # Don't use this.
         self.updateNetworkTables()
-        if (self.getPosition() < self.max - self.getPosition()):
-            self.speedLimit = self.getPosition() * .0015
-        else:
-            self.speedLimit = (self.max- self.getPosition()) * .0015
 
-        self.speedLimit = max([.2, self.speedLimit])
+        position = self.getPosition()
+        self.speedLimit = max([.2, min(position, self.max - position) * .0015])
 
-        #if self.speedLimit > .4:
-            #self.speedLimit = .4
-
-        val = val * self.speedLimit
-
-        if self.isZeroed() and val > 0:
-            self.stop() # does not let a positive direction proceed if zeroed.
-        elif self.getPosition() >= self.max and val < 0:
-            self.stop() # does not let a negative direction proceed if maxed.
-        else:
-            self.motor.set(val)
+        self.motor.set(val * self.speedLimit)
 
     def accelMove(self, direction):
         direction = math.copysign(max(abs(direction) - self.turretDeadband, 0), direction)
@@ -123,16 +155,77 @@ class Turret(CougarSystem):
         self.motor.setSelectedSensorPosition(1500)
 
     def returnToZero(self):
-        self.motor.set(ControlMode.Position, self.min)
+        self.motor.set(ControlMode.MotionMagic, self.min)
 
     def captureOrientation(self):
-        self.fieldAngle = robot.drivetrain.getAngle()
+        '''Hold the way the turret is pointing right now, relative to the field.'''
+        self.fieldAngle = self.getPosition() + robot.drivetrain.getContinuousAngle() * self.ticksPerDegree
 
     def turretFieldOriented(self): # Use for when traveling round the field.
-        if self.getFieldPosition() > 25 and self.getFieldPosition() < self.max - 25 :
-            self.setPosition(self.getFieldPosition())
+        return self.trackFieldAngle()
+
+    def getFieldTarget(self, angle):
+        '''
+        The turret position that points along fieldAngle with the robot at the
+        given gyro angle, taking whichever full turn lands nearest the middle.
+        '''
+
+        target = self.fieldAngle - angle * self.ticksPerDegree
+
+        return self.middle + (target - self.middle + 2048) % 4096 - 2048
+
+    def trackFieldAngle(self):
+        '''
+        Holds fieldAngle while the chassis turns. Motion Magic chases the
+        target and the yaw rate is fed forward, so the turret starts turning
+        with the robot instead of after it has already fallen behind.
+        '''
+
+        return self._trackTarget(self.getFieldTarget(robot.drivetrain.getContinuousAngle()))
+
+    def getGoalBearing(self):
+        '''Degrees from the front of the robot to the goal by odometry, clockwise positive.'''
+
+        pose = robot.drivetrain.getPoseMeters()
+
+        dx = fieldconstants.Goal.x - pose.translation().X()
+        dy = fieldconstants.Goal.y - pose.translation().Y()
+
+        bearing = math.degrees(math.atan2(dy, dx)) - pose.rotation().getDegrees() + self.goalCorrection
+
+        return (bearing + 180) % 360 - 180
+
+    def correctGoalBearing(self, visionBearing):
+        '''Call with the bearing vision sees the goal at, to pull odometry toward it.'''
+
+        error = (visionBearing - self.getGoalBearing() + 180) % 360 - 180
+        self.goalCorrection += error * self.correctionGain
+
+    def preAim(self):
+        '''Points at the goal by odometry, so it is already centred when it comes into view.'''
+
+        target = self.straightAhead + self.getGoalBearing() * self.ticksPerDegree
+        target = self.middle + (target - self.middle + 2048) % 4096 - 2048
+
+        return self._trackTarget(target)
+
+    def _trackTarget(self, target):
+        '''Motion Magic to target, feeding the yaw rate forward.'''
+
+        rate = robot.drivetrain.getYawRate()
+        clamped = self.clampYaBoi(target)
+
+        if clamped == target:
+            velocity = -rate * self.ticksPerDegree / 10 # Ticks per 100ms. Clockwise robot, counter-clockwise turret.
+            feedforward = self.kF * velocity / 1023
         else:
-            self.stop()
+            feedforward = 0 # Parked against a limit, so don't push into it.
+
+        self.motor.set(ControlMode.MotionMagic, clamped, DemandType.ArbitraryFeedforward, feedforward)
+
+        self.onTarget = clamped == target and abs(self.getPosition() - target) <= self.tollerance
+
+        return self.onTarget
 
     def getFieldPosition(self):
         self.degrees = robot.drivetrain.getAngle()
@@ -145,15 +238,12 @@ class Turret(CougarSystem):
         return self.ticks
 
     def setPosition(self, position):
-        self.error = self.getPosition() - position
-        self.rotate = self.error * 0.00075
-        #if abs(self.rotate) > .5:
-            #self.rotate = math.copysign(.5, self.rotate)
-        self.testMove(self.rotate)
-        if self.getPosition() > position - self.tollerance and self.getPosition() < position + self.tollerance:
-            return True
-        else:
-            return False
+        '''Motion Magic to a position, in ticks. Returns True once we are there.'''
+
+        position = self.clampYaBoi(position)
+        self.motor.set(ControlMode.MotionMagic, position)
+
+        return abs(self.getPosition() - position) <= self.tollerance
 
     def updateNetworkTables(self, angle=85.00):
         self.table.putNumber('TurretPosition', round(self.motor.getSelectedSensorPosition(0), 2))
@@ -165,6 +255,21 @@ class Turret(CougarSystem):
     def getPosition(self):
         return self.motor.getSelectedSensorPosition(0)
 
+    def getRobotAngle(self):
+        '''Degrees the turret points away from the front of the robot, clockwise positive.'''
+        return (self.getPosition() - self.straightAhead) / self.ticksPerDegree
+
+    def getStraightAhead(self):
+        return self.straightAhead
+
+    def setStraightAhead(self, position=None):
+        '''Stores where straight ahead is, by default wherever the turret is now.'''
+
+        if position is None:
+            position = self.getPosition()
+
+        self.straightAhead = position
+
     def setMax(self):
         self.motor.setSelectedSensorPosition(self.max, 0, 0)
 
@@ -172,17 +277,14 @@ class Turret(CougarSystem):
         self.motor.set(ControlMode.PercentOutput, math.copysign(min([abs(x), 0.4]), x))
 
     def isLimitSwitch(self): # Limit switch is at the upper end.
-        if not self.limitSwitch.get() or self.getPosition() >= self.max + 10:
-            self.stop()
-            self.setMax()
-            return True
+        return not self.limitSwitch.get()
 
-        return False
+    def isZeroed(self):
+        '''True once the limit switch has told us where we are.'''
+        return self.zeroed
 
     def followTargetPID(self, newPosition):
-        pos = self.clampYaBoi(newPosition)
-
-        self.motor.set(ControlMode.Position, pos)
+        self.motor.set(ControlMode.MotionMagic, self.clampYaBoi(newPosition))
 
     def moveFieldAngle(self, val):
         self.fieldAngle = self.fieldAngle + (val * 1)